@@ -0,0 +1,5 @@
+"""DiscTools benchmarks
+
+These do not touch the network, run them from the repository root, e.g.
+``python -m benchmarks.error_path``
+"""
@@ -0,0 +1,49 @@
+"""Memory allocated per context, for messages which never turn into an invocation
+
+Compares :class:`discord.ext.commands.Context`, a :class:`disctools.TargetContext` which computes
+its targets eagerly, as it used to, and :class:`disctools.TargetContext`.
+"""
+import gc
+import tracemalloc
+from time import perf_counter
+from typing import Callable, Tuple
+
+from discord.ext.commands import Context
+
+from disctools import TargetContext
+
+from .pipeline import make_bot, make_message
+
+N = 20_000
+
+class EagerTargetContext(TargetContext):
+    """TargetContext as it was, with the targets set up in __init__"""
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.targets = self.message.mentions
+
+def measure(make: Callable[[], object], n: int = N) -> Tuple[float, float]:
+    """Returns the bytes allocated and the microseconds taken per context"""
+    keep = [None] * n
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = perf_counter()
+    for i in range(n):
+        keep[i] = make()
+    elapsed = perf_counter() - start
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return allocated / n, elapsed / n * 1e6
+
+def main() -> None:
+    bot, channel = make_bot()
+    message = make_message(bot, channel, "hello there")
+    view = None
+
+    for cls in (Context, EagerTargetContext, TargetContext):
+        size, cost = measure(lambda: cls(message=message, bot=bot, prefix=None, view=view))
+        print(f"{cls.__qualname__:<20} {size:8.1f} bytes/context {cost:8.3f} us/context")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Cost of copying a :class:`disctools.CCmd` tree, as is done when a cog is added"""
+from time import perf_counter
+from unittest import mock
+
+from disctools import CCmd, Command, inject
+
+N = 20
+WIDTH = 10
+
+def leaf(name: str) -> Command:
+    async def main(self, ctx, member: str, *, reason: str = "none"):
+        pass
+
+    return inject(name=name)(type(name, (Command,), {"main": main}))
+
+def tree(name: str, depth: int) -> CCmd:
+    async def main(self, ctx):
+        pass
+
+    attrs = {"main": main}
+    for i in range(WIDTH):
+        child = f"{name}_{i}"
+        attrs[child] = tree(child, depth - 1) if depth > 1 else leaf(child)
+    return type(name, (CCmd,), attrs)(name=name)
+
+def bench(root: CCmd, n: int = N) -> float:
+    start = perf_counter()
+    for _ in range(n):
+        root.copy()
+    return (perf_counter() - start) / n
+
+def main() -> None:
+    root = tree("root", 2)
+    nodes = sum(1 for _ in root.walk_commands()) + 1
+
+    shared = bench(root)
+    with mock.patch.object(Command, "_is_flyweight", lambda self: False):
+        reinit = bench(root)
+
+    print(f"{nodes} nodes")
+    print(f"{'re-initialised copy':<24} {reinit * 1e3:8.3f} ms/copy")
+    print(f"{'flyweight copy':<24} {shared * 1e3:8.3f} ms/copy")
+
+if __name__ == "__main__":
+    main()
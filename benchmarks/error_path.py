@@ -0,0 +1,59 @@
+"""Cost of :meth:`disctools.Command.dispatch_error` per invocation"""
+import asyncio
+from time import perf_counter
+from types import SimpleNamespace
+
+from discord.ext.commands import Cog, CommandError, command
+
+from disctools import CCmd, Command
+
+N = 100_000
+
+class Ping(CCmd):
+    async def main(self, ctx):
+        pass
+
+    async def on_subcommand_error(self, ctx, error):
+        pass
+
+    @command(cls=Command, name="bare")
+    async def bare(self, ctx):
+        pass
+
+    @command(cls=Command, name="handled")
+    async def handled(self, ctx):
+        pass
+
+    @handled.error
+    async def handled_error(self, ctx, error):
+        pass
+
+class ErrorCog(Cog):
+    async def cog_command_error(self, ctx, error):
+        pass
+
+async def bench(cmd: Command, n: int = N) -> float:
+    ctx = SimpleNamespace(bot=SimpleNamespace(dispatch=lambda *args: None))
+    error = CommandError()
+    start = perf_counter()
+    for _ in range(n):
+        await cmd.dispatch_error(ctx, error)
+    return (perf_counter() - start) / n
+
+def main() -> None:
+    group = Ping()
+    cogless = Ping()
+    cogless.bare.cogcmd = None
+    group.handled.cog = ErrorCog()
+
+    cases = {
+        "no handlers": cogless.bare,
+        "cogcmd handler": group.bare,
+        "command, cogcmd & cog handlers": group.handled,
+    }
+    for name, cmd in cases.items():
+        cost = asyncio.run(bench(cmd))
+        print(f"{name:<32} {cost * 1e6:8.3f} us/invocation")
+
+if __name__ == "__main__":
+    main()
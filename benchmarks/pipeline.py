@@ -0,0 +1,190 @@
+"""Throughput and latency of :meth:`discord.ext.commands.Bot.process_commands`
+
+A synthetic message stream is fed to a :class:`disctools.Bot` through a local connection state,
+nothing touches the network. The results are printed, or written with ``--output``, as JSON::
+
+    python -m benchmarks.pipeline --output before.json
+    python -m benchmarks.pipeline --compare before.json
+
+``--compare`` exits with status 1 when the invocations per second of any scenario dropped by
+more than ``--tolerance``.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import sys
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+
+import discord
+
+import disctools
+from disctools import Bot, CCmd, Command, inject
+
+N = 20_000
+WARMUP = 500
+DEPTHS = (1, 3, 5)
+
+AUTHOR = {"id": 3, "username": "user", "discriminator": "0001", "avatar": None}
+
+async def noop(*args, **kwargs):
+    pass
+
+def make_bot() -> Tuple[Bot, discord.TextChannel]:
+    bot = Bot(command_prefix="!")
+    state = bot._connection
+    state.user = discord.ClientUser(state=state, data={**AUTHOR, "id": 9, "username": "bot"})
+
+    guild = discord.Guild(data={"id": 1, "name": "guild", "roles": [], "members": []}, state=state)
+    state._add_guild(guild)
+    channel = discord.TextChannel(state=state, guild=guild,
+                                  data={"id": 2, "name": "channel", "type": 0, "position": 0})
+    guild._add_channel(channel)
+    return bot, channel
+
+def make_message(bot: Bot, channel: discord.TextChannel, content: str) -> discord.Message:
+    data = {
+        "id": 4, "channel_id": channel.id, "author": AUTHOR, "content": content,
+        "member": {"roles": [], "joined_at": None, "deaf": False, "mute": False},
+        "attachments": [], "embeds": [], "mentions": [], "mention_roles": [],
+        "edited_timestamp": None, "type": 0, "pinned": False, "mention_everyone": False, "tts": False
+    }
+    return discord.Message(state=bot._connection, channel=channel, data=data)
+
+def nested(depth: int) -> type:
+    """A CCmd with ``depth`` levels of subcommands, ``g g ... leaf``"""
+    if depth == 1:
+        attrs = {"main": noop, "leaf": inject(name="leaf")(type("leaf", (Command,), {"main": leaf_main}))}
+    else:
+        attrs = {"main": noop, "g": inject(name="g")(nested(depth - 1))}
+    return type(f"level{depth}", (CCmd,), attrs)
+
+async def leaf_main(self, ctx, num: int, word: str):
+    pass
+
+def add_commands(bot: Bot) -> Dict[str, str]:
+    """Registers the commands, returns the message content per scenario"""
+    @bot.command(name="plain")
+    async def plain(ctx, num: int, word: str):
+        pass
+
+    @bot.inject(name="command")
+    class command(Command):
+        main = leaf_main
+
+    scenarios = {
+        "discord.Command": "!plain 1 a",
+        "disctools.Command": "!command 1 a",
+    }
+
+    for depth in DEPTHS:
+        bot.add_command(nested(depth)(name=f"depth{depth}"))
+        scenarios[f"CCmd depth {depth}"] = f"!depth{depth} " + "g " * (depth - 1) + "leaf 1 a"
+
+    def check(ctx):
+        return True
+
+    @bot.inject(name="hooked")
+    class hooked(CCmd):
+        main = noop
+        subcommand_before_invoke = noop
+        subcommand_after_invoke = noop
+
+        @inject(name="leaf")
+        class leaf(Command):
+            main = leaf_main
+            pre_invoke = noop
+            post_invoke = noop
+
+    hooked.leaf.add_check(check)
+    hooked.add_check(check)
+    scenarios["hook heavy"] = "!hooked leaf 1 a"
+    return scenarios
+
+def percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+async def bench(bot: Bot, message: discord.Message, n: int) -> Dict[str, float]:
+    process = bot.process_commands
+    for _ in range(WARMUP):
+        await process(message)
+
+    latencies = []
+    append = latencies.append
+    start = perf_counter()
+    for _ in range(n):
+        t = perf_counter()
+        await process(message)
+        append(perf_counter() - t)
+    total = perf_counter() - start
+
+    latencies.sort()
+    return {
+        "invocations": n,
+        "ips": n / total,
+        "p50_us": percentile(latencies, 0.50) * 1e6,
+        "p99_us": percentile(latencies, 0.99) * 1e6,
+    }
+
+async def run(n: int) -> Dict[str, Dict[str, float]]:
+    bot, channel = make_bot()
+    failures = []
+
+    async def on_command_error(ctx, error):
+        failures.append(error)
+    bot.add_listener(on_command_error)
+
+    results = {}
+    for name, content in add_commands(bot).items():
+        results[name] = await bench(bot, make_message(bot, channel, content), n)
+    await asyncio.sleep(0) # let the error listeners run
+    if failures:
+        raise RuntimeError(f"benchmark commands failed: {failures[0]!r}")
+    return results
+
+def compare(results: Dict[str, Dict[str, float]], path: str, tolerance: float) -> List[str]:
+    with open(path) as f:
+        baseline = json.load(f)["results"]
+    regressions = []
+    for name, now in results.items():
+        before = baseline.get(name)
+        if before is not None and now["ips"] < before["ips"] * (1 - tolerance):
+            regressions.append(f"{name}: {before['ips']:.0f} -> {now['ips']:.0f} invocations/s")
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=N, help="invocations per scenario")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--compare", help="a previous JSON result to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed relative drop in ips")
+    args = parser.parse_args(argv)
+
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "discord.py": discord.__version__,
+            "disctools": disctools.__version__,
+        },
+        "results": asyncio.run(run(args.n)),
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        regressions = compare(report["results"], args.compare, args.tolerance)
+        for line in regressions:
+            print(f"regression: {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
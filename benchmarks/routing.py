@@ -0,0 +1,53 @@
+"""Resolution of deeply nested :class:`disctools.CCmd` subcommands, with and without the router"""
+import asyncio
+from time import perf_counter
+from types import SimpleNamespace
+
+from discord.ext.commands.view import StringView
+
+from disctools import CCmd, Command, inject
+
+N = 20_000
+DEPTH = 5
+WIDTH = 8
+
+class Bot:
+    _before_invoke = None
+    _after_invoke = None
+
+    async def can_run(self, ctx, *, call_once=False):
+        return True
+
+def tree(depth: int) -> type:
+    async def main(self, ctx):
+        pass
+
+    attrs = {"main": main}
+    for i in range(WIDTH):
+        if depth > 1:
+            attrs[f"g{i}"] = inject(name=f"g{i}")(tree(depth - 1))
+        else:
+            attrs[f"c{i}"] = inject(name=f"c{i}")(type(f"c{i}", (Command,), {"main": main}))
+    return type(f"level{depth}", (CCmd,), attrs)
+
+async def bench(root: CCmd, content: str, n: int = N) -> float:
+    bot = Bot()
+    start = perf_counter()
+    for _ in range(n):
+        view = StringView(content)
+        view.skip_string("root")
+        ctx = SimpleNamespace(view=view, bot=bot, invoked_with="root", invoked_parents=[],
+                              invoked_subcommand=None, subcommand_passed=None, command=None)
+        await root.invoke(ctx)
+    return (perf_counter() - start) / n
+
+def main() -> None:
+    cls = tree(DEPTH)
+    content = "root " + " ".join(f"g{WIDTH - 1}" for _ in range(DEPTH - 1)) + " c0"
+
+    for name, root in (("Group.invoke", cls(name="root")), ("router", cls(name="root", use_router=True))):
+        cost = asyncio.run(bench(root, content))
+        print(f"{name:<16} {cost * 1e6:8.3f} us/invocation  ({content!r})")
+
+if __name__ == "__main__":
+    main()
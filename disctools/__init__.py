@@ -3,7 +3,12 @@
 from .__version_info__ import __version__, version_info
 from .abstractions import Cog
 from .bot import AutoShardedBot, Bot
+from .cache import ResultCache
 from .commands import *
-from .context import EmbedingContext, TargetContext
+from .concurrency import CommandOverloaded, ConcurrencyLimit, QueueFull, QueueTimeout
+from .context import CoalescingContext, EmbedingContext, TargetContext
+from .embeds import EmbedTemplate
+from .metrics import InvocationMetrics, PrometheusSink
+from .ratelimit import RateLimit, RateLimited
 
 __author__ = "WizzyGeek"
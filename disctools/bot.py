@@ -22,14 +22,31 @@
 
 from typing import Callable, Type, TypeVar
 
+import discord
 from discord.ext.commands import AutoShardedBot as _AS
 from discord.ext.commands import Bot as _Bot
 from discord.ext.commands import GroupMixin as _GM
 from discord.ext.commands import Command as _C
+from discord.ext.commands import Context as _Context
+
+from .context import CoalescingContext, RolePositionIndex
 
 T = TypeVar("T", bound=_C)
 
 class InjectableBotMixin(_GM):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # keep the role hierarchy indexes of TargetContext in sync
+        for event in ("on_guild_role_create", "on_guild_role_delete", "on_guild_role_update"):
+            self.add_listener(self._invalidate_role_index, event)
+        self.add_listener(self._forget_guild, "on_guild_remove")
+
+    async def _invalidate_role_index(self, role: discord.Role, *args) -> None:
+        RolePositionIndex.invalidate(role.guild)
+
+    async def _forget_guild(self, guild: discord.Guild) -> None:
+        RolePositionIndex.invalidate(guild)
+
     def inject(self, **kwargs) -> Callable[[Type[T]], T]:
         """
         Inject a command class into the Bot.
@@ -43,6 +60,16 @@ class InjectableBotMixin(_GM):
 
         return decorator
 
+    async def invoke(self, ctx: _Context) -> None:
+        # the messages buffered by a CoalescingContext are sent once the invocation is over
+        try:
+            await super().invoke(ctx)
+        finally:
+            if isinstance(ctx, CoalescingContext):
+                # the error and completion listeners run after this, their sends go out directly
+                ctx.coalesce = False
+                await ctx.flush()
+
 class Bot(InjectableBotMixin, _Bot):
     """Represents a discord bot.
 
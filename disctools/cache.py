@@ -0,0 +1,194 @@
+# MIT License
+
+# Copyright (c) 2020-present WizzyGeek
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Result caches for commands"""
+import asyncio
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Union
+
+from discord.ext.commands import Command as _Command
+from discord.ext.commands import Context as _Context
+
+__all__ = (
+    "ResultCache",
+)
+
+_SCOPES: Dict[str, Callable[[_Context], Hashable]] = {
+    "guild": lambda ctx: ctx.guild and ctx.guild.id,
+    "channel": lambda ctx: ctx.channel.id,
+    "user": lambda ctx: ctx.author.id,
+}
+
+def _freeze(value: Any) -> Hashable:
+    # converters may return lists (Greedy, *args), make them usable in a key
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+class ResultCache:
+    """Caches the return value of the callback of a command, keyed by its converted arguments.
+
+    Can be set as ``result_cache`` on a :class:`disctools.Command` or on a :class:`disctools.CCmd`,
+    where it covers all the subcommands, unless they have their own. The entries of each
+    command are kept apart, hence one cache may be shared by several commands.
+
+    When the key is cached, the callback is not called. Override :meth:`disctools.Command.respond`
+    to send the result, it is called with the result of every invocation, cached or not.
+    Concurrent invocations with the same key wait for the same call of the callback,
+    errors are not cached.
+
+    Parameters
+    ----------
+    ttl : Optional[:class:`float`]
+        The seconds an entry is kept for, forever if None, by default None.
+    maxsize : Optional[:class:`int`]
+        The number of entries kept, the least recently used entries are evicted first,
+        unbounded if None, by default 128.
+    scope : Union[None, :class:`str`, Callable[[:class:`discord.ext.commands.Context`], Hashable]]
+        Keeps the entries of each ``"guild"``, ``"channel"`` or ``"user"`` apart, or of the
+        value returned by the callable. By default the entries are shared by everyone.
+
+    Attributes
+    ----------
+    hits : :class:`int`
+        The number of invocations answered from the cache, including those which waited
+        for an in-flight call.
+    misses : :class:`int`
+        The number of invocations which called the callback.
+    """
+    def __init__(self, *, ttl: Optional[float] = None, maxsize: Optional[int] = 128,
+                 scope: Union[None, str, Callable[[_Context], Hashable]] = None) -> None:
+        if isinstance(scope, str):
+            try:
+                scope = _SCOPES[scope]
+            except KeyError:
+                raise ValueError(f"scope must be one of {', '.join(_SCOPES)} or a callable") from None
+        if maxsize is not None and maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.scope = scope
+        self.hits = 0
+        self.misses = 0
+        # key -> (expiry, value), least recently used first
+        self._entries: OrderedDict[Tuple, Tuple[Optional[float], Any]] = OrderedDict()
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+
+    def __repr__(self) -> str:
+        return (f"<{self.__class__.__name__} ttl={self.ttl} maxsize={self.maxsize} "
+                f"size={len(self._entries)} hits={self.hits} misses={self.misses}>")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _scope_of(self, ctx: _Context) -> Hashable:
+        return None if self.scope is None else self.scope(ctx)
+
+    def _name_of(self, command: Union[str, _Command]) -> str:
+        return command if isinstance(command, str) else command.qualified_name
+
+    def key(self, command: _Command, ctx: _Context, args: Tuple, kwargs: Dict[str, Any]) -> Optional[Tuple]:
+        """Returns the key of an invocation, None if the arguments are not hashable."""
+        key = (command.qualified_name, self._scope_of(ctx), _freeze(args), _freeze(kwargs))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    async def call(self, command: _Command, ctx: _Context, callback: Callable, *args, **kwargs) -> Any:
+        """|coro|
+        Returns the cached result of ``callback(*args, **kwargs)`` or calls it.
+        ``ctx`` and the cog or cogcmd, if any, are skipped from the arguments for the key.
+        """
+        skip = args.index(ctx) + 1 if ctx in args[:2] else 0
+        key = self.key(command, ctx, args[skip:], kwargs)
+        if key is None:
+            self.misses += 1
+            return await callback(*args, **kwargs)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] is None or entry[0] > monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            del self._entries[key]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.hits += 1
+            return await asyncio.shield(inflight)
+
+        self.misses += 1
+        future = self._inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            value = await callback(*args, **kwargs)
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception() # retrieved, in case nothing was waiting
+            raise
+        else:
+            future.set_result(value)
+            self._store(key, value)
+            return value
+        finally:
+            del self._inflight[key]
+
+    def _store(self, key: Tuple, value: Any) -> None:
+        self._entries[key] = (None if self.ttl is None else monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        if self.maxsize is not None and len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, command: Union[None, str, _Command] = None, ctx: Optional[_Context] = None) -> int:
+        """Drop cached results, e.g. from a command which changes what they were computed from.
+
+        Parameters
+        ----------
+        command : Union[None, :class:`str`, :class:`discord.ext.commands.Command`]
+            Only drop the results of this command, or qualified name, by default all commands.
+        ctx : Optional[:class:`discord.ext.commands.Context`]
+            Only drop the results in the scope of this context, e.g. of its guild.
+
+        Returns
+        -------
+        :class:`int`
+            The number of results dropped.
+        """
+        name = None if command is None else self._name_of(command)
+        scope = None if ctx is None else self._scope_of(ctx)
+        if name is None and ctx is None:
+            dropped = len(self._entries)
+            self._entries.clear()
+            return dropped
+
+        stale = [key for key in self._entries
+                 if (name is None or key[0] == name) and (ctx is None or key[1] == scope)]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
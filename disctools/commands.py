@@ -21,23 +21,35 @@
 # SOFTWARE.
 from __future__ import annotations
 
+import re
+from asyncio import gather
 from asyncio.coroutines import iscoroutinefunction
-from inspect import Parameter, isawaitable, isclass, ismethod
-from types import FunctionType, MethodType
-from typing import (ClassVar, Coroutine, Generic, TYPE_CHECKING, Any, Callable, Mapping, Optional, Tuple,
-                    Type, TypeVar, Union)
-
-# import discord
+from functools import partial
+from time import perf_counter
+from inspect import Parameter, isawaitable, isclass
+from types import FunctionType, MappingProxyType, MethodType
+from typing import (AsyncIterator, ClassVar, Coroutine, Dict, Generic, TYPE_CHECKING, Any, Callable, Iterable, List, Mapping,
+                    ItemsView, Optional, OrderedDict, Set, Tuple, Type, TypeVar, Union, ValuesView)
+
+import discord
 from discord.errors import ClientException
 from discord.ext.commands import Cog
 from discord.ext.commands import Command as _Command
 from discord.ext.commands import Group as _Group
-from discord.ext.commands.core import command, group, wrap_callback
-from discord.ext.commands.errors import TooManyArguments
+from discord.ext.commands.converter import MemberConverter, UserConverter, _Greedy
+from discord.ext.commands.core import _CaseInsensitiveDict, command, group, hooked_wrapped_callback, wrap_callback
+from discord.ext.commands.errors import (CheckFailure, CommandRegistrationError, MemberNotFound,
+                                        MissingRequiredArgument, TooManyArguments)
 from discord.ext.commands import Context as _Cont
+from discord.ext.commands.core import GroupMixin
+
+from .cache import ResultCache
+from .concurrency import ConcurrencyLimit, acquire_all, release_all
+from .metrics import InvocationMetrics
+from .profiling import ProfileSession
+from .ratelimit import RateLimit, RateLimited
 
 if TYPE_CHECKING:
-    from discord.ext.commands.core import GroupMixin
     from discord.ext.commands.errors import CommandError
 else:
     pass
@@ -58,6 +70,325 @@ def _doc_only(func: T) -> T:
     func.__doc_only__ = None # type: ignore[attr-defined]
     return func
 
+def _overridden(member: Optional[Callable]) -> Optional[Callable]:
+    # The lookup done by Command.call_if_overridden, without the call
+    if member is None:
+        return None
+    if isinstance(member, MethodType):
+        return getattr(member.__func__, "__doc_only__", member)
+    return getattr(member, "__doc_only__", member)
+
+_POK = Parameter.POSITIONAL_OR_KEYWORD
+_KWO = Parameter.KEYWORD_ONLY
+_VARP = Parameter.VAR_POSITIONAL
+
+class _Step:
+    """A single pre-resolved parameter of an :class:`_InvocationPlan`"""
+    __slots__ = ("name", "param", "kind", "converter", "required", "optional", "greedy", "rest", "raw", "dependent",
+                 "batch")
+
+    def __init__(self, command: Command, param: Parameter) -> None:
+        self.name = param.name
+        self.param = param
+        self.kind = kind = param.kind
+        self.required = param.default is param.empty
+        self.optional = command._is_typing_optional(param.annotation)
+        # rest_is_raw conversion is done with the unprocessed converter
+        self.raw = kind == _KWO and command.rest_is_raw
+        self.rest = kind == _KWO and not command.rest_is_raw
+        self.greedy = False
+
+        converter = command._get_converter(param)
+        if type(converter) is _Greedy and not self.raw:
+            # same as Command.transform, Greedy[X] on keyword only params is just X
+            self.greedy = kind != _KWO
+            converter = converter.converter
+        self.converter = converter
+
+        # Whether the outcome of conversion decides how the view is consumed,
+        # Greedy and Optional undo the view when conversion fails.
+        self.dependent = self.greedy or (
+            kind != _VARP
+            and getattr(converter, "__origin__", None) is Union
+            and type(None) in converter.__args__
+        )
+
+        # "member" or "user" if lookups by ID can be done in bulk,
+        # Greedy stops at the first failure and is converted one by one
+        self.batch = None if self.greedy else _BATCHED.get(converter)
+
+_BATCHED = {
+    discord.Member: "member",
+    MemberConverter: "member",
+    discord.User: "user",
+    discord.abc.User: "user",
+    UserConverter: "user",
+}
+_USER_ID = re.compile(r'([0-9]{15,20})$|<@!?([0-9]+)>$')
+_QUERY_LIMIT = 100 # user_ids per member query
+
+def _user_id(argument: str) -> Optional[int]:
+    match = _USER_ID.match(argument)
+    if match is None:
+        return None
+    return int(match.group(1) or match.group(2))
+
+async def _query_members(bot: Any, guild: discord.Guild,
+                         user_ids: List[int]) -> AsyncIterator[Tuple[List[int], List[discord.Member]]]:
+    # Guild.query_members in chunks of user IDs, stops at the first failure and does not
+    # start while the shard is rate limited, the rest is left to the caller.
+    if not user_ids or bot._get_websocket(shard_id=guild.shard_id).is_ratelimited():
+        return
+    cache = guild._state.member_cache_flags.joined
+    for i in range(0, len(user_ids), _QUERY_LIMIT):
+        chunk = user_ids[i:i + _QUERY_LIMIT]
+        try:
+            found = await guild.query_members(limit=_QUERY_LIMIT, user_ids=chunk, cache=cache)
+        except Exception:
+            # e.g. without the members intent
+            return
+        yield chunk, found
+
+async def _fail(exc: Exception) -> Any:
+    raise exc
+
+class _UserBatch:
+    """The users and members mentioned by ID in the arguments of one invocation
+
+    The cache is swept once, whatever is missing is then queried in chunks,
+    the converters are only used for what could not be found this way.
+
+    Attributes
+    ----------
+    members : Dict[:class:`int`, :class:`discord.Member`]
+        Members of the context's guild, only looked up for the members wanted.
+    users : Dict[:class:`int`, :class:`discord.abc.User`]
+        Users, found like :class:`discord.ext.commands.UserConverter` would,
+        i.e. from the user cache, then the mentions.
+    absent : Set[:class:`int`]
+        IDs which were queried but are not members of the guild.
+    """
+    __slots__ = ("members", "users", "absent")
+
+    def __init__(self) -> None:
+        self.members: Dict[int, discord.Member] = {}
+        self.users: Dict[int, discord.abc.User] = {}
+        self.absent: Set[int] = set()
+
+    @classmethod
+    async def resolve(cls, ctx: Context, arguments: Iterable[Tuple[_Step, str]]) -> _UserBatch:
+        self = cls()
+        guild = ctx.guild
+        bot = ctx.bot
+        mentions = {user.id: user for user in ctx.message.mentions}
+        missing = []
+
+        # user ID -> whether a member is needed
+        wanted: Dict[int, bool] = {}
+        for step, argument in arguments:
+            user_id = _user_id(argument)
+            if user_id is not None:
+                wanted[user_id] = wanted.get(user_id, False) or step.batch == "member"
+
+        for user_id, needs_member in wanted.items():
+            user = bot.get_user(user_id) or mentions.get(user_id)
+            if user is not None:
+                self.users[user_id] = user
+            if not needs_member or guild is None:
+                continue
+
+            # same as MemberConverter, mentions in a guild are members
+            member = guild.get_member(user_id) or mentions.get(user_id)
+            if member is not None:
+                self.members[user_id] = member
+            else:
+                missing.append(user_id)
+
+        # Let the converters deal with what is not queried
+        async for chunk, found in _query_members(bot, guild, missing):
+            for member in found:
+                self.members[member.id] = member
+            self.absent.update(user_id for user_id in chunk if user_id not in self.members)
+        return self
+
+    def lookup(self, step: _Step, argument: str) -> Tuple[bool, Any]:
+        """Returns a tuple of whether the argument was found and the result"""
+        user_id = _user_id(argument)
+        if user_id is None:
+            return False, None
+        if step.batch == "member":
+            if user_id in self.members:
+                return True, self.members[user_id]
+            if user_id in self.absent:
+                raise MemberNotFound(argument)
+        elif user_id in self.users:
+            return True, self.users[user_id]
+        return False, None
+
+class _InvocationPlan:
+    """The pre-computed parsing state of a :class:`Command`
+
+    Built lazily from the callback's signature and rebuilt only when
+    :attr:`Command.cog`, :attr:`Command.cogcmd` or :attr:`Command.callback` change.
+
+    Attributes
+    ----------
+    earg : Optional[:class:`str`]
+        The attribute of the command that is passed as ``self`` to the callback, if any.
+    steps : Tuple[:class:`_Step`, ...]
+        The parameters after ``self`` and ``ctx`` which take part in parsing.
+    error : Optional[:class:`str`]
+        A deferred :exc:`discord.ClientException` message for malformed callbacks.
+    independent : :class:`bool`
+        Whether the arguments can be split before any of them is converted.
+    """
+    __slots__ = ("earg", "steps", "error", "independent")
+
+    def __init__(self, command: Command) -> None:
+        self.earg = command._get_extra_arg_source(command.callback)
+        self.error: Optional[str] = None
+        self.steps: Tuple[_Step, ...] = ()
+        self.independent = False
+
+        params = list(command.params.values())
+        skip = 2 if self.earg else 1
+        if len(params) < skip:
+            if self.earg and not params:
+                self.error = 'Callback for {0.name} command is missing "self" parameter.'
+            else:
+                self.error = 'Callback for {0.name} command is missing "ctx" parameter.'
+            return
+
+        steps = []
+        for param in params[skip:]:
+            if param.kind in (_POK, _VARP):
+                steps.append(_Step(command, param))
+            elif param.kind == _KWO:
+                # kwarg only param denotes "consume rest" semantics
+                steps.append(_Step(command, param))
+                break
+        self.steps = tuple(steps)
+        self.independent = not any(step.dependent for step in steps)
+
+class _ErrorChain:
+    """The wrapped error handlers of a :class:`Command`
+
+    The chain remembers the binding it was built for, it is reused as long as the
+    binding stays the same. The handlers are bound to the command, so copies build their own.
+
+    Attributes
+    ----------
+    local : Tuple[Callable, ...]
+        The command's and the cogcmd's error handlers, in that order.
+    cog_handler : Optional[Callable]
+        The cog's error handler, if overridden.
+    """
+    __slots__ = ("cog", "cogcmd", "on_error", "local", "cog_handler")
+
+    def __init__(self, command: Command) -> None:
+        self.cog = cog = command.cog
+        self.cogcmd = cogcmd = command.cogcmd
+        self.on_error = on_error = command.on_error
+        local = []
+
+        if not hasattr(on_error, "__doc_only__"):
+            _earg = command._get_extra_arg(on_error)
+            local.append(wrap_callback(partial(on_error, _earg) if _earg else on_error))
+
+        if cogcmd is not None:
+            handler = _overridden(cogcmd.on_subcommand_error)
+            if handler:
+                local.append(wrap_callback(handler))
+
+        self.local = tuple(local)
+        self.cog_handler = None
+        if cog is not None:
+            handler = Cog._get_overridden_method(cog.cog_command_error)
+            if handler is not None:
+                self.cog_handler = wrap_callback(handler)
+
+    def is_bound_to(self, command: Command) -> bool:
+        return (self.cog is command.cog
+                and self.cogcmd is command.cogcmd
+                and self.on_error == command.on_error)
+
+class _Deferred:
+    """A subcommand definition which is only built on first use, see :func:`inject`"""
+    __slots__ = ("cls", "args", "kwargs", "name", "aliases")
+
+    def __init__(self, cls: Type[_Command], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> None:
+        self.cls = cls
+        self.args = args
+        self.kwargs = kwargs
+        # Same defaults as Command.__init__
+        self.name: str = kwargs.get("name", cls.__name__)
+        self.aliases = kwargs.get("aliases", [])
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        # A cog would never build it, mixins are fine as long as they end up in a CCmd
+        if issubclass(owner, Cog):
+            raise TypeError(f"{owner.__qualname__}.{name}: inject(lazy=True) can only be used in the body of a CCmd")
+
+class _LazyCommands(Dict[str, Any]):
+    """Base for :attr:`discord.ext.commands.GroupMixin.all_commands` which builds
+    deferred subcommands when they are looked up, or when all the commands are listed."""
+    def __init__(self, owner: CCmd, *args: Any) -> None:
+        super().__init__(*args)
+        self.owner = owner
+
+    def _build(self, value: Any) -> Any:
+        if type(value) is not _Deferred:
+            return value
+        cmd = value.cls(*value.args, **value.kwargs)
+        for key in (value.name, *value.aliases):
+            if super().get(key) is value:
+                super().__setitem__(key, cmd)
+        cmd.parent = self.owner
+        cmd.cogcmd = self.owner
+        return cmd
+
+    def _build_all(self) -> None:
+        for deferred in self.pending():
+            self._build(deferred)
+
+    def pending(self) -> List[_Deferred]:
+        """The subcommands which have not been built yet"""
+        return list({id(v): v for v in dict.values(self) if type(v) is _Deferred}.values())
+
+    def __getitem__(self, k: str) -> Any:
+        return self._build(super().__getitem__(k))
+
+    def get(self, k: str, default: Any = None) -> Any:
+        return self._build(super().get(k, default))
+
+    def pop(self, k: str, *args: Any) -> Any:
+        self._build(super().get(k))
+        return super().pop(k, *args)
+
+    def values(self) -> ValuesView[Any]: # type: ignore[override]
+        self._build_all()
+        return super().values()
+
+    def items(self) -> ItemsView[str, Any]: # type: ignore[override]
+        self._build_all()
+        return super().items()
+
+    def copy(self) -> Dict[str, Any]:
+        self._build_all()
+        return dict(super().items())
+
+class _LazyDict(_LazyCommands):
+    pass
+
+class _LazyCaseInsensitiveDict(_LazyCommands, _CaseInsensitiveDict):
+    pass
+
+def _subcommands(attrs: Dict[str, Any]) -> Dict[str, Any]:
+    # the parent-less commands, or the ones adopted by a CCmd, of a class body
+    return {key: attr for key, attr in attrs.items()
+            if isinstance(attr, _Deferred)
+            or (isinstance(attr, _Command) and (not attr.parent or getattr(attr, "cogcmd", None) is attr.parent))}
+
 # PHILOSOPHY:: [I Like Grouped Commands]
 ## Types ##
 
@@ -74,23 +405,38 @@ class CogCommandType(type):
     Internal Workings
     -----------------
     Adds an attribute named ``__fut_sub_cmds__`` of type ``Dict[str, discord.ext.commands.Command]``
-    to the class. On the first initialisation of the class, the commands are registered as subcommands.
-    All the instances following the first do not register the subcommands as they are assumed to be
-    copies of the first instance, hence their proper initialiasation is assumed to be handled by
-    the (``copy()`` method of the) first instance of the class.
+    to the class, an index of the subcommands by attribute name. The index of a subclass is built
+    from the indexes of its bases and its own body, the bases are not scanned again and their entries
+    are taken as they are, a name is only dropped when a later class shadows the attribute. Bases which
+    are not :class:`CogCommandType` instances, e.g. mixins, have no index and are scanned, commands which
+    an instance already adopted count as parent-less.
+    The index is never modified after the class is created.
+
+    On initialisation, the commands are registered as subcommands. The first instance adopts the
+    commands defined in the class body, the instances following the first register copies of them.
+    Commands injected with ``lazy=True`` are registered as definitions, which each instance builds
+    when the subcommand is first looked up.
     """
     def __new__(cls, name, bases, attrs, **kwargs):
-        subcommands = {}
         command_cls = super().__new__(cls, name, bases, attrs, **kwargs)
-        for base in reversed(command_cls.__mro__[0:-1]):
-            for name, attr in base.__dict__.items():
-                if isinstance(attr, _Command):
-                    if name in subcommands:
-                        del subcommands[name]
-                    if not attr.parent:
-                        subcommands[name] = attr
-        else:
-            command_cls.__fut_sub_cmds__ = subcommands
+
+        found: Dict[str, Any] = {}
+        for base in reversed(command_cls.__mro__[1:]):
+            if isinstance(base, CogCommandType):
+                # taken as they are, an instance of the base may have adopted them since
+                found.update(base.__fut_sub_cmds__)
+            else:
+                found.update(_subcommands(vars(base)))
+        found.update(_subcommands(attrs))
+
+        subcommands = {}
+        for key, attr in found.items():
+            # the attribute which wins by the MRO, it may shadow a command with something else
+            winner = getattr(command_cls, key, None)
+            if winner is attr or _subcommands({key: winner}):
+                subcommands[key] = winner
+
+        command_cls.__fut_sub_cmds__ = subcommands
         return command_cls
 
 ## Commands ##
@@ -105,6 +451,27 @@ class Command(_Command, Generic[Context]):
     ----------
     cogcmd : Optional[:class:`disctools.commands.CCmd`]
         The :class:`CogCmd` the Command belongs to.
+    concurrent_conversion : :class:`bool`
+        Whether the arguments are converted concurrently, defaults to ``False``.
+        The arguments are split up first and the conversions are then run with
+        :func:`asyncio.gather`, this helps when converters make API calls.
+        Commands with :class:`discord.ext.commands.Greedy` or :obj:`typing.Optional`
+        parameters are always converted in order. Can also be set in the class body.
+    concurrency_limit : Optional[:class:`disctools.concurrency.ConcurrencyLimit`]
+        Limits the invocations of the command which run at once, the limit of a :class:`CCmd`
+        covers its subcommands as well. The ``concurrency_limit`` attribute of the cog, if any,
+        covers all of its commands. Can also be set in the class body.
+    metrics : Optional[:class:`disctools.metrics.InvocationMetrics`]
+        Records the time spent in each phase of the invocations, the metrics of a :class:`CCmd`
+        cover its subcommands as well, unless they have their own. Otherwise the ``metrics``
+        attribute of the cog, if any, is used. Can also be set in the class body.
+    result_cache : Optional[:class:`disctools.cache.ResultCache`]
+        Caches the result of :meth:`main` by the converted arguments, the cache of a :class:`CCmd`
+        covers its subcommands as well, unless they have their own. Override :meth:`respond` to
+        send the result. Can also be set in the class body.
+    rate_limit : Optional[:class:`disctools.ratelimit.RateLimit`]
+        A token bucket rate limit, checked along with the cooldowns. The limit of a :class:`CCmd`
+        covers its subcommands as well, in addition to their own. Can also be set in the class body.
 
     Example
     -------
@@ -144,8 +511,21 @@ class Command(_Command, Generic[Context]):
         An error occurred in Test owned by SomeCog
 
     """
-    cogcmd: Optional[CCmd]
     use_main: ClassVar[bool] = False
+    concurrent_conversion: bool = False
+    concurrency_limit: Optional[ConcurrencyLimit] = None
+    metrics: Optional[InvocationMetrics] = None
+    result_cache: Optional[ResultCache] = None
+    rate_limit: Optional[RateLimit] = None
+    _cog: Optional[Cog] = None
+    _cogcmd: Optional[CCmd] = None
+    _plan: Optional[_InvocationPlan] = None
+    _hooks: Optional[Tuple[Tuple[Callable, ...], Tuple[Callable, ...]]] = None
+    _errors: Optional[_ErrorChain] = None
+    _profile: Optional[ProfileSession] = None
+    _clean_params: Optional[Mapping[str, Parameter]] = None
+    _before_hook: Optional[Callable] = None
+    _after_hook: Optional[Callable] = None
 
     def __init__(self, func: Optional[AsyncCallable] = None, **kwargs) -> None:
         if func is None or self.use_main:
@@ -165,11 +545,11 @@ class Command(_Command, Generic[Context]):
             self.after_invoke(self.post_invoke)
 
         self.name = kwargs.get('name', str(self.__class__.__name__))
-
-        try:
-            self.cogcmd
-        except AttributeError:
-            self.cogcmd = None
+        self.concurrent_conversion = kwargs.get("concurrent_conversion", self.concurrent_conversion)
+        self.concurrency_limit = kwargs.get("concurrency_limit", self.concurrency_limit)
+        self.metrics = kwargs.get("metrics", self.metrics)
+        self.result_cache = kwargs.get("result_cache", self.result_cache)
+        self.rate_limit = kwargs.get("rate_limit", self.rate_limit)
 
         if hasattr(self, "on_error"):
             if not iscoroutinefunction(self.on_error):
@@ -193,6 +573,67 @@ class Command(_Command, Generic[Context]):
                 setattr(main_m, '__doc__', getattr(cls, '__doc__', None))
         return super().__init_subclass__()
 
+    # The invocation plan depends on these, hence they invalidate it.
+    @property
+    def cog(self) -> Optional[Cog]:
+        return self._cog
+
+    @cog.setter
+    def cog(self, value: Optional[Cog]) -> None:
+        self._cog = value
+        self._invalidate()
+
+    @property
+    def cogcmd(self) -> Optional[CCmd]:
+        return self._cogcmd
+
+    @cogcmd.setter
+    def cogcmd(self, value: Optional[CCmd]) -> None:
+        self._cogcmd = value
+        self._invalidate()
+
+    @property
+    def callback(self) -> AsyncCallable:
+        return self._callback
+
+    @callback.setter
+    def callback(self, function: AsyncCallable) -> None:
+        _Command.callback.fset(self, function)
+        self._invalidate()
+
+    # Reassigning a hook, by any means, drops the compiled hook chains.
+    @property
+    def _before_invoke(self) -> Optional[Callable]:
+        return self._before_hook
+
+    @_before_invoke.setter
+    def _before_invoke(self, coro: Optional[Callable]) -> None:
+        self._before_hook = coro
+        self._hooks = None
+
+    @property
+    def _after_invoke(self) -> Optional[Callable]:
+        return self._after_hook
+
+    @_after_invoke.setter
+    def _after_invoke(self, coro: Optional[Callable]) -> None:
+        self._after_hook = coro
+        self._hooks = None
+
+    @property
+    def params(self) -> OrderedDict[str, Parameter]:
+        return self._params
+
+    @params.setter
+    def params(self, value: OrderedDict[str, Parameter]) -> None:
+        self._params = value
+        self._clean_params = None
+
+    def _invalidate(self) -> None:
+        self._plan = None
+        self._hooks = None
+        self._clean_params = None
+
     @property
     def owner(self) -> Union[CCmd, Cog, GroupMixin, _Command, None]:
         """Union[
@@ -235,6 +676,16 @@ class Command(_Command, Generic[Context]):
         """
         pass
 
+    @_doc_only
+    async def respond(self, ctx: Context, result: Any) -> Any:
+        """|overridecoro|
+        Called with the result of :meth:`main`, or the cached result, when the command
+        has a :attr:`result_cache`.
+
+        This can be over-rided as a static method.
+        """
+        pass
+
     @_doc_only
     async def on_error(self, ctx: Context, error: CommandError):
         """|overridecoro|
@@ -242,29 +693,69 @@ class Command(_Command, Generic[Context]):
         """
         pass
 
-    async def dispatch_error(self, ctx: Context, error: CommandError) -> None:
-        ctx.command_failed = True
-        cog = self.cog
-        cogcmd = self.cogcmd
+    def _get_error_chain(self) -> _ErrorChain:
+        chain = self._errors
+        if chain is None or not chain.is_bound_to(self):
+            chain = self._errors = _ErrorChain(self)
+        return chain
 
-        if not hasattr(self.on_error, "__doc_only__"):
-            injected = wrap_callback(self.on_error)
-            _earg = self._get_extra_arg(self.on_error)
-            if _earg:
-                await injected(_earg, ctx, error)
-            await injected(ctx, error)
+    def _is_flyweight(self) -> bool:
+        # Subclasses with their own __init__ may keep per instance state,
+        # those are copied by re-initialisation.
+        return type(self).__init__ in _FLYWEIGHT_INITS
 
-        if cogcmd is not None:
-            await wrap_callback(self.call_if_overridden)(cogcmd.on_subcommand_error, ctx, error)
+    def _clone(self) -> Command:
+        """Copy without re-initialisation.
+
+        The command definition, i.e. the callback, params, docs, and settings are shared,
+        per binding state is reset and the methods bound to this command are rebound to the copy.
+        """
+        other = object.__new__(self.__class__)
+        state = other.__dict__
+        for key, value in self.__dict__.items():
+            if isinstance(value, MethodType) and value.__self__ is self:
+                value = MethodType(value.__func__, other)
+            state[key] = value
+
+        for key in _BINDING_STATE:
+            state.pop(key, None)
+
+        # These are mutated in place or hold runtime state
+        other.checks = self.checks.copy()
+        other._buckets = self._buckets.copy()
+        if self._max_concurrency is not None:
+            other._max_concurrency = self._max_concurrency.copy()
+        if isinstance(self, GroupMixin):
+            commands = self.all_commands
+            if isinstance(commands, _LazyCommands):
+                other.all_commands = type(commands)(other)
+            else:
+                other.all_commands = type(commands)()
+        return other
+
+    def copy(self) -> Command:
+        if self._is_flyweight():
+            return self._clone()
+        return super().copy()
+
+    async def dispatch_error(self, ctx: Context, error: CommandError) -> None:
+        ctx.command_failed = True
+        chain = self._get_error_chain()
+        metrics = self._get_metrics()
+        start = perf_counter()
 
         try:
-            if cog is not None:
-                local = Cog._get_overridden_method(cog.cog_command_error)
-                if local is not None:
-                    wrapped = wrap_callback(local)
-                    await wrapped(ctx, error)
+            for handler in chain.local:
+                await handler(ctx, error)
+
+            try:
+                if chain.cog_handler is not None:
+                    await chain.cog_handler(ctx, error)
+            finally:
+                ctx.bot.dispatch('command_error', ctx, error)
         finally:
-            ctx.bot.dispatch('command_error', ctx, error)
+            if metrics is not None:
+                metrics.lap(self, "dispatch_error", start)
 
     def _needs_ccmd(self, func: Callable) -> bool:
         if self.cogcmd is not None and not isinstance(func, MethodType):
@@ -287,72 +778,113 @@ class Command(_Command, Generic[Context]):
             return False
         return False
 
-    def _get_extra_arg(self, func: Callable) -> Union[Cog, CCmd, None]:
+    def _get_extra_arg_source(self, func: Callable) -> Optional[str]:
         if self._needs_ccmd(func):
-            return self.cogcmd
+            return "cogcmd"
         if self._needs_cog(func):
-            return self.cog
+            return "cog"
         return None
 
+    def _get_extra_arg(self, func: Callable) -> Union[Cog, CCmd, None]:
+        source = self._get_extra_arg_source(func)
+        return getattr(self, source) if source else None
+
     @property
     def clean_params(self) -> Mapping[str, Parameter]:
         """:meta private:""" # Has Been documented in dpy.
-        result = self.params.copy()
+        result = self._clean_params
+        if result is not None:
+            return result
 
-        if not ismethod(self.callback):
-            if self._needs_cog(self.callback) or self._needs_ccmd(self.callback):
-                result.popitem(last=False) # self
+        params = self.params.copy()
+        if self._get_extra_arg_source(self.callback):
+            params.popitem(last=False) # self
 
         try:
-            result.popitem(last=False) # ctx, we will have at least 2 standard params
+            params.popitem(last=False) # ctx, we will have at least 2 standard params
         except Exception:
             raise ValueError('Missing context parameter') from None
+
+        result = self._clean_params = MappingProxyType(params)
         return result
 
+    def _get_plan(self) -> _InvocationPlan:
+        plan = self._plan
+        if plan is None:
+            plan = self._plan = _InvocationPlan(self)
+        return plan
+
+    async def _transform_step(self, ctx: Context, step: _Step) -> Any:
+        # Command.transform, with everything known ahead of time taken from the plan
+        view = ctx.view
+        view.skip_ws()
+
+        if step.greedy:
+            if step.kind == _POK:
+                return await self._transform_greedy_pos(ctx, step.param, step.required, step.converter)
+            return await self._transform_greedy_var_pos(ctx, step.param, step.converter)
+
+        if view.eof:
+            if step.kind == _VARP:
+                raise RuntimeError() # break the loop
+            if step.required:
+                if step.optional:
+                    return None
+                raise MissingRequiredArgument(step.param)
+            return step.param.default
+
+        previous = view.index
+        if step.rest:
+            argument = view.read_rest().strip()
+        else:
+            argument = view.get_quoted_word()
+        view.previous = previous
+
+        return await self.do_conversion(ctx, step.converter, argument, step.param)
+
     async def _parse_arguments(self, ctx: Context) -> None:
-        _earg = self._get_extra_arg(self.callback)
+        plan = self._get_plan()
+        if plan.error is not None:
+            raise ClientException(plan.error.format(self))
+
+        _earg = getattr(self, plan.earg) if plan.earg else None
         ctx.args = [_earg, ctx] if _earg else [ctx]
         ctx.kwargs = {}
         args = ctx.args
         kwargs = ctx.kwargs
 
         view = ctx.view
-        iterator = iter(self.params.items())
-
-        if _earg:
-            # we have 'self' as the first parameter so just advance
-            # the iterator and resume parsing
-            try:
-                next(iterator)
-            except StopIteration:
-                fmt = 'Callback for {0.name} command is missing "self" parameter.'
-                raise ClientException(fmt.format(self))
-
-        # next we have the 'ctx' as the next parameter
-        try:
-            next(iterator)
-        except StopIteration:
-            fmt = 'Callback for {0.name} command is missing "ctx" parameter.'
-            raise ClientException(fmt.format(self))
-
-        for name, param in iterator:
-            if param.kind == param.POSITIONAL_OR_KEYWORD:
-                transformed = await self.transform(ctx, param)
-                args.append(transformed)
-            elif param.kind == param.KEYWORD_ONLY:
-                # kwarg only param denotes "consume rest" semantics
-                if self.rest_is_raw:
-                    converter = self._get_converter(param)
+        if self.concurrent_conversion and plan.independent:
+            await self._convert_concurrently(ctx, plan)
+            return
+
+        for step in plan.steps:
+            if step.kind == _POK:
+                args.append(await self._transform_step(ctx, step))
+            elif step.kind == _KWO:
+                if step.raw:
                     argument = view.read_rest()
-                    kwargs[name] = await self.do_conversion(ctx, converter, argument, param)
+                    kwargs[step.name] = await self.do_conversion(ctx, step.converter, argument, step.param)
                 else:
-                    kwargs[name] = await self.transform(ctx, param)
-                break
-            elif param.kind == param.VAR_POSITIONAL:
+                    kwargs[step.name] = await self._transform_step(ctx, step)
+            elif step.batch:
+                arguments = []
+                while True:
+                    view.skip_ws()
+                    if view.eof:
+                        break
+                    arguments.append((step, view.get_quoted_word()))
+
+                batch = await _UserBatch.resolve(ctx, arguments)
+                for _, argument in arguments:
+                    found, value = batch.lookup(step, argument)
+                    if not found:
+                        value = await self.do_conversion(ctx, step.converter, argument, step.param)
+                    args.append(value)
+            else:
                 while not view.eof:
                     try:
-                        transformed = await self.transform(ctx, param)
-                        args.append(transformed)
+                        args.append(await self._transform_step(ctx, step))
                     except RuntimeError:
                         break
 
@@ -360,55 +892,344 @@ class Command(_Command, Generic[Context]):
             if not view.eof:
                 raise TooManyArguments('Too many arguments passed to ' + self.qualified_name)
 
-    async def call_before_hooks(self, ctx: Context) -> None:
+    def _split_step(self, ctx: Context, step: _Step) -> Tuple[bool, Any]:
+        # Command.transform up to the point of conversion, for independent steps.
+        # Returns whether the argument needs conversion and the argument or the final value.
+        view = ctx.view
+        if step.raw:
+            return True, view.read_rest()
+
+        view.skip_ws()
+        if view.eof:
+            if step.required:
+                if step.optional:
+                    return False, None
+                raise MissingRequiredArgument(step.param)
+            return False, step.param.default
+
+        previous = view.index
+        if step.rest:
+            argument = view.read_rest().strip()
+        else:
+            argument = view.get_quoted_word()
+        view.previous = previous
+        return True, argument
+
+    def _convert_split(self, ctx: Context, step: _Step, argument: str, batch: Optional[_UserBatch]) -> Tuple[bool, Any]:
+        # Returns whether the value is awaitable and the value
+        if batch is not None and step.batch:
+            try:
+                found, value = batch.lookup(step, argument)
+            except MemberNotFound as exc:
+                return True, _fail(exc)
+            if found:
+                return False, value
+        return True, self.do_conversion(ctx, step.converter, argument, step.param)
+
+    async def _convert_concurrently(self, ctx: Context, plan: _InvocationPlan) -> None:
+        view = ctx.view
+        # (step, needs_conversion, argument or value) in declaration order
+        split = []
+        error: Optional[Exception] = None
+
+        try:
+            for step in plan.steps:
+                if step.kind == _VARP:
+                    while True:
+                        view.skip_ws()
+                        if view.eof:
+                            break
+                        split.append((step, True, view.get_quoted_word()))
+                else:
+                    split.append((step, *self._split_step(ctx, step)))
+            if not self.ignore_extra and not view.eof:
+                raise TooManyArguments('Too many arguments passed to ' + self.qualified_name)
+        except Exception as exc:
+            # Raised after the preceding conversions, as they would have been in order.
+            error = exc
+
+        batch = None
+        if any(step.batch for step, convert, _ in split if convert):
+            batch = await _UserBatch.resolve(ctx, ((step, arg) for step, convert, arg in split if convert and step.batch))
+
+        slots = [(step, *self._convert_split(ctx, step, value, batch)) if convert else (step, False, value)
+                 for step, convert, value in split]
+        results = iter(await gather(*(value for _, pending, value in slots if pending), return_exceptions=True))
+        args = ctx.args
+        kwargs = ctx.kwargs
+        for step, pending, value in slots:
+            if pending:
+                value = next(results)
+                if isinstance(value, BaseException):
+                    raise value
+            if step.kind == _KWO:
+                kwargs[step.name] = value
+            else:
+                args.append(value)
+
+        if error is not None:
+            raise error
+
+    def _bind_hook(self, hook: Optional[Callable]) -> Optional[Callable]:
+        hook = _overridden(hook)
+        if not hook:
+            return None
+        _earg = self._get_extra_arg(hook)
+        if _earg:
+            return partial(hook, _earg)
+        return hook
+
+    def _compile_hooks(self) -> Tuple[Tuple[Callable, ...], Tuple[Callable, ...]]:
+        """Collect the overridden cog, cogcmd & command hooks, in invocation order.
+
+        The bot hooks are looked up on every call since they belong to ``ctx.bot``.
+        """
         cog = self.cog
         cogcmd = self.cogcmd
+        before = []
+        after = []
+
+        if cog is not None:
+            before.append(Cog._get_overridden_method(cog.cog_before_invoke))
+            after.append(Cog._get_overridden_method(cog.cog_after_invoke))
+
+        if cogcmd is not None:
+            before.append(_overridden(cogcmd.subcommand_before_invoke))
+            after.append(_overridden(cogcmd.subcommand_after_invoke))
+
+        before.append(self._bind_hook(self._before_invoke))
+        after.append(self._bind_hook(self._after_invoke))
 
+        after.reverse()
+        return tuple(filter(None, before)), tuple(filter(None, after))
+
+    def _get_hooks(self) -> Tuple[Tuple[Callable, ...], Tuple[Callable, ...]]:
+        hooks = self._hooks
+        if hooks is None:
+            hooks = self._hooks = self._compile_hooks()
+        return hooks
+
+    async def call_before_hooks(self, ctx: Context) -> None:
         hook = ctx.bot._before_invoke
         if hook is not None:
             await hook(ctx)
 
-        # call the cog local hook if applicable:
-        if cog is not None:
-            hook = Cog._get_overridden_method(cog.cog_before_invoke)
+        for hook in self._get_hooks()[0]:
+            ret = hook(ctx)
+            if isawaitable(ret):
+                await ret
+
+    async def call_after_hooks(self, ctx: Context) -> None:
+        # set by prepare, the callback ran in between
+        timing = getattr(ctx, "_timing", None)
+        if timing is not None:
+            ctx._timing = None
+            metrics = timing[0]
+            start = metrics.lap(self, "callback", timing[1])
+
+        try:
+            for hook in self._get_hooks()[1]:
+                ret = hook(ctx)
+                if isawaitable(ret):
+                    await ret
+
+            # call the bot global hook if necessary
+            hook = ctx.bot._after_invoke
             if hook is not None:
                 await hook(ctx)
 
-        if cogcmd is not None:
-            await self.call_if_overridden(cogcmd.subcommand_before_invoke, ctx)
+            if timing is not None:
+                metrics.lap(self, "after_hooks", start)
+        finally:
+            # the invocation is over, free the concurrency limits
+            held = getattr(ctx, "_held_limits", None)
+            if held:
+                ctx._held_limits = ()
+                release_all(held)
+
+            profile = getattr(ctx, "_profiling", None)
+            if profile is not None:
+                ctx._profiling = None
+                profile.end()
+
+    def _get_concurrency_limits(self) -> List[ConcurrencyLimit]:
+        # outermost first, the cog, the cogcmds and then the command itself
+        limits = []
+        cmd: Optional[Command] = self
+        cog = None
+        while cmd is not None:
+            if cmd.concurrency_limit is not None:
+                limits.append(cmd.concurrency_limit)
+            cog = cmd.cog or cog
+            cmd = cmd.cogcmd
+
+        limit = getattr(cog, "concurrency_limit", None)
+        if limit is not None:
+            limits.append(limit)
+        limits.reverse()
+        return limits
+
+    def _prepare_cooldowns(self, ctx: Context) -> None:
+        super()._prepare_cooldowns(ctx)
+
+        # outermost first, a token is needed from every limit
+        limits: List[RateLimit] = []
+        cmd: Optional[Command] = self
+        while cmd is not None:
+            if cmd.rate_limit is not None:
+                limits.append(cmd.rate_limit)
+            cmd = cmd.cogcmd
+        limits.reverse()
+
+        for i, limit in enumerate(limits):
+            retry_after = limit.take(ctx)
+            if retry_after:
+                for previous in limits[:i]:
+                    previous.refund(ctx)
+                raise RateLimited(limit, retry_after)
+
+    def _get_metrics(self) -> Optional[InvocationMetrics]:
+        # the innermost metrics win
+        cmd: Optional[Command] = self
+        cog = None
+        while cmd is not None:
+            if cmd.metrics is not None:
+                return cmd.metrics
+            cog = cmd.cog or cog
+            cmd = cmd.cogcmd
+        return getattr(cog, "metrics", None)
+
+    def _get_result_cache(self) -> Optional[ResultCache]:
+        cmd: Optional[Command] = self
+        while cmd is not None:
+            if cmd.result_cache is not None:
+                return cmd.result_cache
+            cmd = cmd.cogcmd
+        return None
 
-        if self._before_invoke is not None:
-            _earg = self._get_extra_arg(self._before_invoke)
-            if _earg:
-                _arg: Union[Tuple[Union[Cog, CCmd, None], Context], Tuple[Context]] = (_earg, ctx)
-            else:
-                _arg = (ctx,)
-            await self.call_if_overridden(self._before_invoke, *_arg)
+    async def invoke(self, ctx: Context) -> None:
+        cache = self._get_result_cache()
+        if cache is None or isinstance(self, GroupMixin):
+            # groups pass the invocation on, their subcommands use the cache
+            return await super().invoke(ctx)
+
+        # discord.ext.commands.Command.invoke, with the callback going through the cache
+        await self.prepare(ctx)
+        ctx.invoked_subcommand = None
+        ctx.subcommand_passed = None
+        injected = hooked_wrapped_callback(self, ctx, partial(self._call_cached, cache, ctx))
+        await injected(*ctx.args, **ctx.kwargs)
+
+    async def _call_cached(self, cache: ResultCache, ctx: Context, *args, **kwargs) -> Any:
+        result = await cache.call(self, ctx, self.callback, *args, **kwargs)
+        await self.call_if_overridden(self.respond, ctx, result)
+        return result
 
-    async def call_after_hooks(self, ctx: Context) -> None:
-        cog = self.cog
-        cogcmd = self.cogcmd
-        if self._after_invoke is not None:
-            _earg = self._get_extra_arg(self._after_invoke)
-            if _earg:
-                _arg: Union[Tuple[Union[Cog, CCmd, None], Context], Tuple[Context]] = (_earg, ctx)
-            else:
-                _arg = (ctx,)
-            await self.call_if_overridden(self._after_invoke, *_arg)
+    def _get_profile(self) -> Optional[ProfileSession]:
+        cmd: Optional[Command] = self
+        while cmd is not None:
+            if cmd._profile is not None:
+                return cmd._profile
+            cmd = cmd.cogcmd
+        return None
 
-        if cogcmd is not None:
-            await self.call_if_overridden(cogcmd.subcommand_after_invoke, ctx)
+    def start_profiling(self, path: str, *,
+                        invocations: Optional[int] = None,
+                        seconds: Optional[float] = None,
+                        mode: str = "deterministic",
+                        interval: float = 0.001) -> ProfileSession:
+        """Profile the next invocations of this command, for a :class:`CCmd` the invocations
+        of its subcommands are profiled too. Any previous session of this command is stopped.
 
-        # call the cog local hook if applicable:
-        if cog is not None:
-            hook = Cog._get_overridden_method(cog.cog_after_invoke)
-            if hook is not None:
-                await hook(ctx)
+        Parameters
+        ----------
+        path : :class:`str`
+            The file the profile is written to.
+        invocations : Optional[:class:`int`]
+            The number of invocations to profile.
+        seconds : Optional[:class:`float`]
+            The number of seconds to profile for.
+        mode : :class:`str`
+            ``deterministic`` for a :mod:`pstats` file, ``sampling`` for collapsed stacks,
+            by default ``deterministic``.
+        interval : :class:`float`
+            The seconds between samples in the ``sampling`` mode.
+
+        Raises
+        ------
+        :exc:`RuntimeError`
+            Not called from a coroutine or callback running on the event loop of the bot.
 
-        # call the bot global hook if necessary
-        hook = ctx.bot._after_invoke
-        if hook is not None:
-            await hook(ctx)
+        Returns
+        -------
+        :class:`disctools.profiling.ProfileSession`
+            The session, :meth:`~disctools.profiling.ProfileSession.wait` for it to end.
+        """
+        session = ProfileSession(self, path, invocations=invocations, seconds=seconds,
+                                 mode=mode, interval=interval)
+        if self._profile is not None:
+            self._profile.stop()
+        self._profile = session
+        return session
+
+    async def prepare(self, ctx: Context) -> None:
+        profile = self._get_profile()
+        if profile is None or not profile.start():
+            return await self._prepare(ctx)
+
+        ctx._profiling = profile
+        try:
+            await self._prepare(ctx)
+        except:
+            ctx._profiling = None
+            profile.end()
+            raise
+
+    async def _prepare(self, ctx: Context) -> None:
+        # discord.ext.commands.Command.prepare, with the concurrency limits acquired after the checks
+        ctx.command = self
+        metrics = self._get_metrics()
+        start = perf_counter()
+
+        if not await self.can_run(ctx):
+            raise CheckFailure('The check functions for command {0.qualified_name} failed.'.format(self))
+
+        if metrics is not None:
+            metrics.lap(self, "checks", start)
+
+        limits = self._get_concurrency_limits()
+        if limits:
+            ctx._held_limits = await acquire_all(ctx, limits)
+
+        try:
+            if self._max_concurrency is not None:
+                await self._max_concurrency.acquire(ctx)
+
+            try:
+                if not self.cooldown_after_parsing:
+                    self._prepare_cooldowns(ctx)
+
+                start = perf_counter()
+                await self._parse_arguments(ctx)
+                if metrics is not None:
+                    metrics.lap(self, "parse", start)
+
+                if self.cooldown_after_parsing:
+                    self._prepare_cooldowns(ctx)
+
+                start = perf_counter()
+                await self.call_before_hooks(ctx)
+                if metrics is not None:
+                    ctx._timing = (metrics, metrics.lap(self, "before_hooks", start))
+            except:
+                if self._max_concurrency is not None:
+                    await self._max_concurrency.release(ctx)
+                raise
+        except:
+            if limits:
+                ctx._held_limits = ()
+                release_all(limits)
+            raise
 
     @staticmethod
     async def call_if_overridden(member: Union[MethodType, Callable], *args, **kwargs) -> Any:
@@ -431,22 +1252,100 @@ class CCmd(Command[Context], _Group, metaclass=CogCommandType, _root=True):
     any features on top of it.
 
     Also called :class:`CogCmd`
+
+    Attributes
+    ----------
+    use_router : :class:`bool`
+        Whether the invoked subcommand is resolved in a single pass, defaults to ``False``.
+        Nested groups which are invoked without a command are walked through directly,
+        instead of through their :meth:`invoke`. Can also be set in the class body.
     """
+    use_router: bool = False
+    all_commands: Dict[str, Any]
+
     def __init__(self, func: Optional[AsyncCallable] = None, **kwargs) -> None:
         super().__init__(func=func, **kwargs)
-        if self.__class__.__fut_sub_cmds__:
-            for i in self.__class__.__fut_sub_cmds__.values():
-                self.add_command(i)
-                i.cogcmd = self
-            self.__class__.__fut_sub_cmds__.clear()
-
-    def copy(self):
-        ret: CCmd = _Command.copy(self)
-        for cmd in map(lambda x: x.copy(), self.commands):
+        self.use_router = kwargs.get("use_router", self.use_router)
+        for i in self.__class__.__fut_sub_cmds__.values():
+            if isinstance(i, _Deferred):
+                self._add_deferred(i)
+                continue
+            if i.parent is not None:
+                # adopted by an earlier instance
+                i = i.copy()
+            self.add_command(i)
+            i.cogcmd = self
+
+    def copy(self) -> CCmd:
+        if self._is_flyweight():
+            ret: CCmd = self._clone()
+        else:
+            ret = _Command.copy(self)
+            # drop the subcommands registered by __init__, ours are copied below
+            ret.all_commands.clear()
+        commands = self.all_commands
+        if isinstance(commands, _LazyCommands):
+            for deferred in commands.pending():
+                ret._add_deferred(deferred)
+            built = set(v for v in dict.values(commands) if type(v) is not _Deferred)
+        else:
+            built = self.commands
+
+        for cmd in map(lambda x: x.copy(), built):
             ret.add_command(cmd)
             cmd.cogcmd = ret
         return ret
 
+    def _add_deferred(self, deferred: _Deferred) -> None:
+        # GroupMixin.add_command, for subcommands which are yet to be built
+        commands = self.all_commands
+        if not isinstance(commands, _LazyCommands):
+            lazy = _LazyCaseInsensitiveDict if self.case_insensitive else _LazyDict
+            commands = self.all_commands = lazy(self, commands)
+
+        if deferred.name in commands:
+            raise CommandRegistrationError(deferred.name)
+
+        commands[deferred.name] = deferred
+        for alias in deferred.aliases:
+            if alias in commands:
+                self.remove_command(deferred.name)
+                raise CommandRegistrationError(alias, alias_conflict=True)
+            commands[alias] = deferred
+
+    async def invoke(self, ctx: Context) -> None:
+        if not (self.use_router and self.invoke_without_command):
+            return await super().invoke(ctx)
+
+        # discord.ext.commands.Group.invoke, unrolled over the groups which would just pass
+        # the invocation on. The all_commands mappings already form a token trie which is kept
+        # up to date, including aliases and case folding, by add_command & remove_command.
+        view = ctx.view
+        group: GroupMixin = self
+        while True:
+            ctx.invoked_subcommand = None
+            ctx.subcommand_passed = None
+            previous = view.index
+            view.skip_ws()
+            trigger = view.get_word()
+
+            if trigger:
+                ctx.subcommand_passed = trigger
+                ctx.invoked_subcommand = group.all_commands.get(trigger, None)
+
+            ctx.invoked_parents.append(ctx.invoked_with)
+            sub = ctx.invoked_subcommand
+            if not (trigger and sub):
+                # undo the trigger parsing
+                view.index = previous
+                view.previous = previous
+                return await _Command.invoke(group, ctx)
+
+            ctx.invoked_with = trigger
+            if not (type(sub).invoke in _ROUTABLE_INVOKES and sub.invoke_without_command):
+                return await sub.invoke(ctx)
+            group = sub
+
     @_doc_only
     async def on_subcommand_error(self, ctx: Context, error: CommandError) -> Any:
         """|overridecoro|
@@ -536,11 +1435,17 @@ class CCmd(Command[Context], _Group, metaclass=CogCommandType, _root=True):
 # Alias
 CogCmd = CCmd
 
+_FLYWEIGHT_INITS = (Command.__init__, CCmd.__init__)
+# Groups whose invocation the router may unroll
+_ROUTABLE_INVOKES = (CCmd.invoke, _Group.invoke)
+# Attributes which depend on where the command is bound, or belong to that one command
+_BINDING_STATE = ("_cog", "_cogcmd", "_plan", "_hooks", "_clean_params", "_errors", "_profile")
+
 ## Decorators ##
 
 G = TypeVar("G", bound=Command)
 
-def inject(*args, **kwargs) -> Callable[[Type[G]], G]:
+def inject(*args, lazy: bool = False, **kwargs) -> Callable[[Type[G]], G]:
     """This is a Decorator.
 
     Return a class's instance
@@ -549,6 +1454,10 @@ def inject(*args, **kwargs) -> Callable[[Type[G]], G]:
     ----------
     args
         The positional arguments to use to initialise the class.
+    lazy : :class:`bool`
+        Only record the definition, for subcommands defined in the body of a :class:`CCmd`.
+        Each instance of the :class:`CCmd` builds the command when it is first looked up, invoked,
+        or listed, e.g. by the help command. Defaults to ``False``.
     kwargs
         The Key-word arguments to use to initialise the class.
 
@@ -561,6 +1470,9 @@ def inject(*args, **kwargs) -> Callable[[Type[G]], G]:
     ------
     :exc:`TypeError`
         If instead of a class (aka type instance) a :class:`discord.ext.commands.Command` is provided.
+    :exc:`TypeError`
+        If a ``lazy`` command is assigned in the body of a :class:`discord.ext.commands.Cog`,
+        only a :class:`CCmd` builds them. Before Python 3.12 this is chained to a :exc:`RuntimeError`.
 
 
     Example
@@ -575,5 +1487,7 @@ def inject(*args, **kwargs) -> Callable[[Type[G]], G]:
     def decorator(cls: Type[G]) -> G:
         if isinstance(cls, _Command):
             raise TypeError("Can not inject a command instance, expected a <class 'type'>")
+        if lazy:
+            return _Deferred(cls, args, kwargs) # type: ignore[return-value]
         return cls(*args, **kwargs)
     return decorator
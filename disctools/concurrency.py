@@ -0,0 +1,216 @@
+# MIT License
+
+# Copyright (c) 2020-present WizzyGeek
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Concurrency limits with bounded wait queues for commands"""
+import asyncio
+from heapq import heapify, heappop, heappush
+from itertools import count
+from time import monotonic
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from discord.ext.commands import CommandError
+from discord.ext.commands import Context as _Context
+
+__all__ = (
+    "ConcurrencyLimit",
+    "CommandOverloaded",
+    "QueueFull",
+    "QueueTimeout"
+)
+
+class CommandOverloaded(CommandError):
+    """Base exception for invocations rejected by a :class:`ConcurrencyLimit`.
+
+    This inherits from :exc:`discord.ext.commands.CommandError`, hence it is handled by
+    :meth:`disctools.Command.dispatch_error` like any other error.
+
+    Attributes
+    ----------
+    limit : :class:`ConcurrencyLimit`
+        The limit which rejected the invocation.
+    """
+    def __init__(self, limit: "ConcurrencyLimit", message: str) -> None:
+        self.limit = limit
+        super().__init__(message)
+
+class QueueFull(CommandOverloaded):
+    """The invocation was shed since the wait queue was full."""
+    def __init__(self, limit: "ConcurrencyLimit") -> None:
+        super().__init__(limit, "Too many invocations are waiting, try again later.")
+
+class QueueTimeout(CommandOverloaded):
+    """The invocation waited in the queue for longer than :attr:`ConcurrencyLimit.timeout`."""
+    def __init__(self, limit: "ConcurrencyLimit") -> None:
+        super().__init__(limit, "Timed out waiting for a free slot, try again later.")
+
+class ConcurrencyLimit:
+    """Limits how many invocations run at once, the rest wait in a bounded queue.
+
+    Can be set as ``concurrency_limit`` on a :class:`disctools.Command`, a :class:`disctools.CCmd`,
+    where it covers all the subcommands too, or on a :class:`discord.ext.commands.Cog`, where it
+    covers all the commands of the cog. The same instance may be shared by several commands.
+
+    When the queue is full, the invocation with the lowest priority is shed, which may be the
+    invocation that just arrived. Shed and timed out invocations raise a :exc:`CommandOverloaded`.
+
+    Parameters
+    ----------
+    concurrency : :class:`int`
+        The number of invocations which may run at once.
+    queue : Optional[:class:`int`]
+        The number of invocations which may wait, unbounded if None, by default None.
+    timeout : Optional[:class:`float`]
+        The seconds an invocation may wait for, unbounded if None, by default None.
+    priority : Optional[Callable[[:class:`discord.ext.commands.Context`], :class:`int`]]
+        Returns the priority of an invocation, higher is served first, by default all are equal.
+        Invocations of equal priority are served in order of arrival.
+
+    Attributes
+    ----------
+    running : :class:`int`
+        The number of invocations running.
+    shed : :class:`int`
+        The number of invocations shed so far.
+    timed_out : :class:`int`
+        The number of invocations which timed out so far.
+    waited : :class:`int`
+        The number of invocations which had to wait for a slot.
+    wait_time : :class:`float`
+        The total seconds spent waiting by :attr:`waited` invocations.
+    max_wait_time : :class:`float`
+        The longest wait so far in seconds.
+    """
+    def __init__(self, concurrency: int, *,
+                 queue: Optional[int] = None,
+                 timeout: Optional[float] = None,
+                 priority: Optional[Callable[[_Context], int]] = None) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if queue is not None and queue < 0:
+            raise ValueError("queue can not be negative")
+
+        self.concurrency = concurrency
+        self.queue = queue
+        self.timeout = timeout
+        self.priority = priority
+
+        self.running = 0
+        self.shed = 0
+        self.timed_out = 0
+        self.waited = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        # heap of [-priority, arrival, future]
+        self._waiters: List[List[Any]] = []
+        self._arrivals = count()
+
+    def __repr__(self) -> str:
+        return (f"<{self.__class__.__name__} concurrency={self.concurrency} running={self.running} "
+                f"waiting={self.waiting} queue={self.queue} timeout={self.timeout}>")
+
+    @property
+    def waiting(self) -> int:
+        """:class:`int`: The current depth of the wait queue."""
+        return len(self._waiters)
+
+    @property
+    def mean_wait_time(self) -> float:
+        """:class:`float`: The mean seconds spent waiting by invocations which had to wait."""
+        return self.wait_time / self.waited if self.waited else 0.0
+
+    def _discard(self, entry: List[Any]) -> None:
+        try:
+            self._waiters.remove(entry)
+        except ValueError:
+            pass
+        else:
+            heapify(self._waiters)
+
+    async def acquire(self, ctx: _Context) -> None:
+        """|coro|
+        Wait for a slot.
+
+        Raises
+        ------
+        :exc:`QueueFull`
+            The invocation was shed.
+        :exc:`QueueTimeout`
+            No slot was free within :attr:`timeout` seconds.
+        """
+        if self.running < self.concurrency and not self._waiters:
+            self.running += 1
+            return
+
+        entry: List[Any] = [-self.priority(ctx) if self.priority else 0, next(self._arrivals), None]
+        if self.queue is not None and len(self._waiters) >= self.queue:
+            worst = max(self._waiters, default=None)
+            if worst is None or entry[:2] > worst[:2]:
+                self.shed += 1
+                raise QueueFull(self)
+            self._discard(worst)
+            self.shed += 1
+            worst[2].set_exception(QueueFull(self))
+
+        future = entry[2] = asyncio.get_running_loop().create_future()
+        heappush(self._waiters, entry)
+        start = monotonic()
+        try:
+            await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            self._discard(entry)
+            self.timed_out += 1
+            raise QueueTimeout(self) from None
+        except asyncio.CancelledError:
+            self._discard(entry)
+            if future.done() and not future.cancelled() and future.exception() is None:
+                # the slot was handed over just before the cancellation
+                self.release()
+            raise
+
+        waited = monotonic() - start
+        self.waited += 1
+        self.wait_time += waited
+        self.max_wait_time = max(self.max_wait_time, waited)
+
+    def release(self) -> None:
+        """Free a slot, it is handed over to the next waiting invocation if any."""
+        while self._waiters:
+            future = heappop(self._waiters)[2]
+            if not future.done():
+                future.set_result(None)
+                return
+        self.running -= 1
+
+async def acquire_all(ctx: _Context, limits: Sequence[ConcurrencyLimit]) -> Tuple[ConcurrencyLimit, ...]:
+    """Acquire all the limits in order, or none of them."""
+    acquired: List[ConcurrencyLimit] = []
+    try:
+        for limit in limits:
+            await limit.acquire(ctx)
+            acquired.append(limit)
+    except BaseException:
+        release_all(acquired)
+        raise
+    return tuple(acquired)
+
+def release_all(limits: Sequence[ConcurrencyLimit]) -> None:
+    for limit in reversed(limits):
+        limit.release()
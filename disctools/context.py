@@ -22,12 +22,21 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from typing import Optional, Sequence, Tuple, Union, TypeVar, cast
+import asyncio
+import re
+from inspect import isawaitable
+from time import monotonic
+from typing import (Any, Awaitable, Callable, ClassVar, Dict, FrozenSet, Hashable, Iterable, List, Optional,
+                    Sequence, Tuple, Type, Union, TypeVar, cast)
 
 import discord
 from discord.ext.commands import Context as _Context
 
+from .commands import _query_members
+from .embeds import EmbedPaginator, EmbedTemplate
+
 T = TypeVar('T', bound=discord.abc.User)
+R = TypeVar('R', bound="ActionReport")
 
 def _maybe_sequence(doubtful: Union[T, Sequence[T]]) -> Sequence[T]:
     if not isinstance(doubtful, Sequence):
@@ -38,6 +47,216 @@ def _maybe_sequence(doubtful: Union[T, Sequence[T]]) -> Sequence[T]:
 Targets = Union[discord.abc.User, Sequence[discord.abc.User]]
 MemberTargets = Union[discord.Member, Sequence[discord.Member]]
 
+def _key(user: Union[discord.abc.Snowflake, int]) -> Hashable:
+    # users compare by ID, objects without one by identity
+    if isinstance(user, int):
+        return user
+    return getattr(user, "id", user)
+
+class _Targets(List[discord.abc.User]):
+    """The targets of a :class:`TargetContext`, a list which keeps the IDs of its users
+
+    The IDs are computed when first used and dropped whenever the list is modified in place.
+    """
+    __slots__ = ("_ids",)
+
+    def __init__(self, users: Iterable[discord.abc.User] = ()) -> None:
+        super().__init__(users)
+        self._ids: Optional[FrozenSet[int]] = None
+
+    @property
+    def ids(self) -> FrozenSet[int]:
+        ids = self._ids
+        if ids is None:
+            ids = self._ids = frozenset(user.id for user in self)
+        return ids
+
+def _modifies(name: str) -> Callable[..., Any]:
+    method = getattr(list, name)
+
+    def modify(self: _Targets, *args: Any) -> Any:
+        self._ids = None
+        return method(self, *args)
+
+    modify.__name__ = name
+    return modify
+
+for _name in ("__setitem__", "__delitem__", "__iadd__", "__imul__", "append", "extend", "insert", "pop", "remove", "clear"):
+    setattr(_Targets, _name, _modifies(_name))
+del _name
+
+def _retry_after(exc: Exception, attempt: int) -> Optional[float]:
+    """The seconds to back off for before retrying, None if the error is final"""
+    if isinstance(exc, (asyncio.TimeoutError, ConnectionError)):
+        return 2.0 ** attempt
+    if not isinstance(exc, discord.HTTPException):
+        return None
+    if exc.status == 429:
+        try:
+            return float(exc.response.headers["Retry-After"])
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return 2.0 ** attempt
+    if exc.status >= 500:
+        return 2.0 ** attempt
+    return None
+
+# user mentions and IDs on their own, separated by whitespace or commas, so that
+# the IDs in role and channel mentions, message links and the like are left alone
+_TARGET_ID = re.compile(r"<@!?([0-9]{15,20})>|(?<![^\s,])([0-9]{15,20})(?![^\s,])")
+_ATTACHMENT_LIMIT = 1 << 20 # bytes read from an attachment of IDs
+_TEXT_EXTENSIONS = (".txt", ".csv")
+
+def _is_id_list(attachment: discord.Attachment) -> bool:
+    # anything else, e.g. an image, is not worth downloading and may contain digits by chance
+    if attachment.size > _ATTACHMENT_LIMIT:
+        return False
+    content_type = attachment.content_type or ""
+    return content_type.startswith("text/") or attachment.filename.lower().endswith(_TEXT_EXTENSIONS)
+
+def _target_ids(text: str) -> Iterable[int]:
+    for match in _TARGET_ID.finditer(text):
+        yield int(match.group(1) or match.group(2))
+
+class TargetResolution:
+    """The progress of :meth:`TargetContext.resolve_targets`.
+
+    Attributes
+    ----------
+    total : :class:`int`
+        The number of distinct IDs found.
+    resolved : :class:`int`
+        The number of IDs resolved to members so far.
+    missing : List[:class:`int`]
+        The IDs which are not of members of the guild, known once :attr:`done`.
+    done : :class:`bool`
+        Whether the resolution is over.
+    """
+    __slots__ = ("total", "resolved", "missing", "done")
+
+    def __init__(self, total: int) -> None:
+        self.total = total
+        self.resolved = 0
+        self.missing: List[int] = []
+        self.done = False
+
+    def __repr__(self) -> str:
+        return (f"<{self.__class__.__name__} resolved={self.resolved}/{self.total} "
+                f"missing={len(self.missing)} done={self.done}>")
+
+class RolePositionIndex:
+    """The roles of a guild ranked by hierarchy, as plain integers.
+
+    Ranks compare like :class:`discord.Role` objects do. The index of a guild is built on first
+    use and dropped by :class:`disctools.Bot` when a role of the guild is created, updated or
+    deleted. With other bots, call :meth:`invalidate` from those events.
+
+    Attributes
+    ----------
+    ranks : Dict[:class:`int`, :class:`int`]
+        The rank by role ID, the ``@everyone`` role is 0.
+    """
+    __slots__ = ("ranks", "size")
+    _indexes: ClassVar[Dict[int, "RolePositionIndex"]] = {}
+
+    def __init__(self, guild: discord.Guild) -> None:
+        # discord.Guild.roles is sorted lowest first
+        self.ranks = {role.id: rank for rank, role in enumerate(guild.roles)}
+        self.size = len(self.ranks)
+
+    @classmethod
+    def of(cls, guild: discord.Guild) -> "RolePositionIndex":
+        """Returns the index of a guild, building it if needed."""
+        index = cls._indexes.get(guild.id)
+        # a missed create or delete shows up in the role count
+        if index is None or index.size != len(guild._roles):
+            index = cls._indexes[guild.id] = cls(guild)
+        return index
+
+    @classmethod
+    def invalidate(cls, guild: discord.abc.Snowflake) -> None:
+        """Drop the index of a guild."""
+        cls._indexes.pop(guild.id, None)
+
+    def rank_of(self, member: discord.Member) -> int:
+        """Returns the rank of the top role of a member."""
+        ranks = self.ranks
+        return max([ranks.get(role_id, 0) for role_id in member._roles], default=0)
+
+class TargetResult:
+    """The outcome of an action on one target, see :meth:`TargetContext.run_on_targets`.
+
+    Attributes
+    ----------
+    target : :class:`discord.abc.User`
+        The target.
+    result : Any
+        What the action returned.
+    error : Optional[:exc:`Exception`]
+        Why the action failed, None if it did not.
+    attempts : :class:`int`
+        The number of times the action was tried, 0 if the run was stopped before reaching the target.
+    """
+    __slots__ = ("target", "result", "error", "attempts")
+
+    def __init__(self, target: discord.abc.User) -> None:
+        self.target = target
+        self.result: Any = None
+        self.error: Optional[Exception] = None
+        self.attempts = 0
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} target={self.target!r} ok={self.ok} attempts={self.attempts}>"
+
+    @property
+    def ok(self) -> bool:
+        """:class:`bool`: Whether the action succeeded."""
+        return self.attempts > 0 and self.error is None
+
+class ActionReport:
+    """The outcome of :meth:`TargetContext.run_on_targets`.
+
+    Attributes
+    ----------
+    results : List[:class:`TargetResult`]
+        The result per target, in the order of the targets.
+    """
+    __slots__ = ("results",)
+
+    def __init__(self, results: List[TargetResult]) -> None:
+        self.results = results
+
+    def __repr__(self) -> str:
+        return (f"<{self.__class__.__name__} succeeded={len(self.succeeded)} failed={len(self.failed)} "
+                f"skipped={len(self.skipped)}>")
+
+    def __bool__(self) -> bool:
+        """Whether the action succeeded on all the targets"""
+        return all(result.ok for result in self.results)
+
+    @property
+    def succeeded(self) -> List[discord.abc.User]:
+        """List[:class:`discord.abc.User`]: The targets the action succeeded on."""
+        return [result.target for result in self.results if result.ok]
+
+    @property
+    def failed(self) -> List[Tuple[discord.abc.User, Exception]]:
+        """List[Tuple[:class:`discord.abc.User`, :exc:`Exception`]]: The targets the action failed on and why."""
+        return [(result.target, result.error) for result in self.results if result.error is not None]
+
+    @property
+    def skipped(self) -> List[discord.abc.User]:
+        """List[:class:`discord.abc.User`]: The targets not reached before the run was stopped."""
+        return [result.target for result in self.results if not result.attempts]
+
+class WhisperReport(ActionReport):
+    """The outcome of :meth:`TargetContext.whisper`, an :class:`ActionReport`."""
+    __slots__ = ()
+
+    @property
+    def delivered(self) -> List[discord.abc.User]:
+        """List[:class:`discord.abc.User`]: The users who were messaged, in the order they were given."""
+        return self.succeeded
+
 class TargetContext(_Context):
     """A Context class with utilities to determine Member hierarchy.
 
@@ -47,27 +266,141 @@ class TargetContext(_Context):
     ====
     The functions of this class can only be used when the message of the context belongs to a guild
     """
-    _target: Sequence[discord.abc.User]
+    # nothing is computed until used, most contexts are never invoked
+    __slots__ = ("_target",)
+
+    _target: Optional[_Targets]
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self._target = None
-        self.targets = self.message.mentions
 
     @property
     def targets(self) -> Sequence[discord.abc.User]:
         """Sequence[:class:`discord.abc.User`] : A sequence of Users that were mentioned, this should be set on invoke.
-        By default it is set to a list of mentioned users in the message"""
-        return self._target
+        By default it is set to a list of mentioned users in the message, the targets are kept in a list of their own"""
+        targets = self._target
+        if targets is None:
+            targets = self._target = _Targets(self.message.mentions)
+        return targets
 
     @targets.setter
     def targets(self, user: Targets) -> None:
-        self._target = _maybe_sequence(user)
+        self._target = _Targets(_maybe_sequence(user))
+
+    @property
+    def target_ids(self) -> FrozenSet[int]:
+        """FrozenSet[:class:`int`] : The IDs of the :attr:`targets`, for constant time membership tests.
+        Computed once and again only after :attr:`targets` is assigned or modified in place."""
+        self.targets # the default targets
+        targets = self._target
+        assert targets is not None
+        return targets.ids
+
+    def common_targets(self, users: Iterable[Union[discord.abc.Snowflake, int]]) -> List[discord.abc.User]:
+        """Returns the targets which are among ``users``, in the order of :attr:`targets`.
+
+        Parameters
+        ----------
+        users : Iterable[Union[:class:`discord.abc.Snowflake`, :class:`int`]]
+            The users, or their IDs.
+        """
+        ids = set(map(_key, users))
+        return [target for target in self.targets if _key(target) in ids]
+
+    def other_targets(self, users: Iterable[Union[discord.abc.Snowflake, int]]) -> List[discord.abc.User]:
+        """Returns the targets which are not among ``users``, in the order of :attr:`targets`.
+
+        Parameters
+        ----------
+        users : Iterable[Union[:class:`discord.abc.Snowflake`, :class:`int`]]
+            The users, or their IDs.
+        """
+        ids = set(map(_key, users))
+        return [target for target in self.targets if _key(target) not in ids]
+
+    async def resolve_targets(self, content: Optional[str] = None, *,
+                              attachments: bool = True,
+                              progress: Optional[Callable[[TargetResolution], Any]] = None) -> TargetResolution:
+        """|coro|
+        Set the targets from user IDs and mentions, e.g. a pasted list of IDs or an attached file of them.
+
+        User mentions and IDs separated by whitespace or commas are picked up, IDs within role or
+        channel mentions and message links are not. The IDs are resolved against the member cache
+        of the guild first, the rest are requested in chunks of 100 through the gateway, like
+        :meth:`discord.Guild.query_members`, unless the shard is rate limited.
+        :attr:`targets` is extended as the members are resolved, and is in the order of the IDs
+        once done, so the hierarchy checks like :meth:`is_author_above` can be used on it.
+
+        Parameters
+        ----------
+        content : Optional[:class:`str`]
+            The text to take IDs from, by default the content of the message.
+        attachments : :class:`bool`
+            Whether to take IDs from the text attachments of the message too, by default True.
+            Only ``text/*``, ``.txt`` and ``.csv`` attachments of at most 1 MiB are downloaded.
+        progress : Optional[Callable[[:class:`TargetResolution`], Any]]
+            Called after each step of the resolution, this may be a coroutine function.
+
+        Raises
+        ------
+        :exc:`ValueError`
+            guild attribute is None.
+
+        Returns
+        -------
+        :class:`TargetResolution`
+            The finished resolution.
+        """
+        guild = self.guild
+        if guild is None:
+            raise ValueError(f"Expected discord.Guild instance at {self.__class__.__qualname__}.guild instead got None")
+
+        texts = [self.message.content if content is None else content]
+        if attachments:
+            for attachment in self.message.attachments:
+                if _is_id_list(attachment):
+                    texts.append((await attachment.read()).decode("utf-8", "replace"))
+
+        # dict for ordered de-duplication
+        ids = dict.fromkeys(user_id for text in texts for user_id in _target_ids(text))
+        state = TargetResolution(len(ids))
+        found: Dict[int, discord.Member] = {}
+        self.targets = []
+
+        async def report() -> None:
+            self.targets = list(found.values())
+            state.resolved = len(found)
+            if progress is not None:
+                ret = progress(state)
+                if isawaitable(ret):
+                    await ret
+
+        missing = []
+        for user_id in ids:
+            member = guild.get_member(user_id)
+            if member is None:
+                missing.append(user_id)
+            else:
+                found[user_id] = member
+        await report()
+
+        # what is not queried is left missing
+        async for _, members in _query_members(self.bot, guild, missing):
+            for member in members:
+                found[member.id] = member
+            await report()
+
+        found = {user_id: found[user_id] for user_id in ids if user_id in found}
+        state.missing = [user_id for user_id in ids if user_id not in found]
+        state.done = True
+        await report()
+        return state
 
     @property
     def is_author_target(self) -> bool:
         """:class:`bool`: This property is equivalent to ``ctx.is_user_target(ctx.author)``"""
-        return self.author in self.targets
+        return self.is_user_target(self.author)
 
     def is_user_target(self, user: discord.abc.User) -> bool:
         """Check if a user is a target
@@ -82,7 +415,7 @@ class TargetContext(_Context):
         :class:`bool`
             True if the user is the target, else False
         """
-        return user in self.targets
+        return _key(user) in self.target_ids
 
 
     def _above_check(self, user: discord.Member,
@@ -114,6 +447,85 @@ class TargetContext(_Context):
         else:
             return True, None
 
+    def partition_above(self, user: discord.Member,
+                        users: Optional[MemberTargets] = None
+                        ) -> Tuple[List[discord.Member], List[discord.Member]]:
+        """Split members into those who are not above ``user`` and those who are.
+
+        This is the bulk form of :meth:`is_author_above`, the ranks of the top roles are compared
+        as integers from the :class:`RolePositionIndex` of the guild, in one pass.
+
+        Parameters
+        ----------
+        user : :class:`discord.Member`
+            The member acting on the others.
+        users :  Optional[Union[:class:`discord.Member`, Sequence[:class:`discord.Member`]]]
+            The member(s) to check against, if None, then command's targets are used, by default None.
+
+        Raises
+        ------
+        :exc:`ValueError`
+            guild attribute is None.
+
+        Returns
+        -------
+        Tuple[List[:class:`discord.Member`], List[:class:`discord.Member`]]
+            The members who are not above ``user`` and every member who is, in the given order.
+        """
+        return self._partition((user,), users)
+
+    def partition_targets(self, users: Optional[MemberTargets] = None
+                          ) -> Tuple[List[discord.Member], List[discord.Member]]:
+        """Split members into those both the author and the bot are above, and the rest.
+
+        Parameters
+        ----------
+        users :  Optional[Union[:class:`discord.Member`, Sequence[:class:`discord.Member`]]]
+            The member(s) to check against, if None, then command's targets are used, by default None.
+
+        Raises
+        ------
+        :exc:`TypeError`
+            The author or :attr:`me` is not a :class:`discord.Member` instance.
+        :exc:`ValueError`
+            guild attribute is None.
+
+        Returns
+        -------
+        Tuple[List[:class:`discord.Member`], List[:class:`discord.Member`]]
+            The actionable members and every blocked member, in the given order.
+        """
+        for member in (self.author, self.me):
+            if not isinstance(member, discord.Member):
+                raise TypeError(f"Expected discord.Member instance, got {type(member)}")
+
+        return self._partition((self.author, self.me), users)
+
+    def _partition(self, users: Sequence[discord.Member],
+                   members: Optional[MemberTargets]
+                   ) -> Tuple[List[discord.Member], List[discord.Member]]:
+        if self.guild is None:
+            raise ValueError(f"Expected discord.Guild instance at {self.__class__.__qualname__}.guild instead got None")
+
+        members = self.targets if members is None else _maybe_sequence(members)
+        owner_id = self.guild.owner_id
+        index = RolePositionIndex.of(self.guild)
+        ranks = index.ranks
+        # the owner is above everyone, the rank every member has to be at or below
+        limits = [index.rank_of(user) for user in users if user.id != owner_id]
+        if not limits:
+            return list(members), []
+        limit = min(limits)
+
+        actionable: List[discord.Member] = []
+        blocked: List[discord.Member] = []
+        for member in members:
+            if member.id == owner_id or max([ranks.get(r, 0) for r in member._roles], default=0) > limit:
+                blocked.append(member)
+            else:
+                actionable.append(member)
+        return actionable, blocked
+
     def is_author_above(self,
                         users: Optional[MemberTargets] = None
                         ) -> Tuple[bool, Optional[discord.Member]]:
@@ -170,30 +582,114 @@ class TargetContext(_Context):
         raise TypeError(f"{self.__class__.__qualname__}.me is of type {type(self.me)}, expected discord.Member instance.")
 
     async def whisper(self, users: Optional[Union[Sequence[discord.User], discord.User]] = None,
-                      *args, **kwargs) -> None:
+                      *args, concurrency: int = 5, retries: int = 3, **kwargs) -> WhisperReport:
         """|coro|
         DM all targets of a command.
 
+        The messages are sent concurrently. When Discord answers with a 429 or a server error,
+        all the sends back off for the advised time, or exponentially, and the failed send is retried.
+
         Parameters
         ----------
         users : Optional(Union[:class:`discord.User`, List[:class:`discord.User`]])
             The user(s) to DM. Defaults to self.targets.
         args
             The positional arguments that should be used to message the targets.
+        concurrency : :class:`int`
+            The maximum number of sends in flight, by default 5.
+        retries : :class:`int`
+            The number of times a send is retried after a 429 or a server error, by default 3.
         kwargs
             The Key-word arguments that should be used to message the targets.
 
         Returns
         -------
-            NoneType
+        :class:`WhisperReport`
+            Which users were messaged and which were not, and why.
         """
         if users is None:
             # This could be a Member, but that doesn't matter
             # since Member virtually inherits User
             users = cast(Sequence[discord.User], self.targets) # type: ignore[redundant-cast]
-        users = _maybe_sequence(users)
-        for target in users:
-            target.send(*args, **kwargs)
+        return await self._run_on_targets(lambda user: user.send(*args, **kwargs), users,
+                                          concurrency, retries, None, WhisperReport)
+
+    async def run_on_targets(self, action: Callable[[discord.abc.User], Awaitable[Any]],
+                             users: Optional[Targets] = None, *,
+                             concurrency: int = 5,
+                             retries: int = 3,
+                             stop: Optional[asyncio.Event] = None) -> ActionReport:
+        """|coro|
+        Run an action, e.g. a ban, kick or role edit, on every target.
+
+        Up to ``concurrency`` actions run at once. Actions which fail with a 429, a server error
+        or a connection error are retried up to ``retries`` times. All the actions of the run back off
+        meanwhile, for the advised time of the 429 or exponentially, since the actions of a run
+        usually share a rate limit route. Other errors are final.
+
+        Example
+        -------
+        .. code-block:: python
+
+            actionable, blocked = ctx.partition_targets()
+            report = await ctx.run_on_targets(lambda member: member.ban(reason="raid"), actionable)
+
+        Parameters
+        ----------
+        action : Callable[[:class:`discord.abc.User`], Awaitable]
+            Called with each target.
+        users : Optional[Union[:class:`discord.abc.User`, Sequence[:class:`discord.abc.User`]]]
+            The targets, by default :attr:`targets`.
+        concurrency : :class:`int`
+            The maximum number of actions in flight, by default 5.
+        retries : :class:`int`
+            The number of times a failed action is retried, by default 3.
+        stop : Optional[:class:`asyncio.Event`]
+            When set, no more actions are started, the targets not reached are
+            :attr:`ActionReport.skipped`. Cancelling the call cancels the actions in flight.
+
+        Returns
+        -------
+        :class:`ActionReport`
+            The result per target.
+        """
+        return await self._run_on_targets(action, users, concurrency, retries, stop, ActionReport)
+
+    async def _run_on_targets(self, action: Callable[[discord.abc.User], Awaitable[Any]],
+                              users: Optional[Targets],
+                              concurrency: int,
+                              retries: int,
+                              stop: Optional[asyncio.Event],
+                              report: Type[R]) -> R:
+        users = _maybe_sequence(self.targets if users is None else users)
+        results = [TargetResult(user) for user in users]
+        pending = iter(results)
+        resume_at = 0.0 # shared, a 429 pauses every action
+
+        async def worker() -> None:
+            nonlocal resume_at
+            for result in pending:
+                while stop is None or not stop.is_set():
+                    delay = resume_at - monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    result.attempts += 1
+                    try:
+                        result.result = await action(result.target)
+                    except Exception as exc:
+                        result.error = exc
+                        backoff = _retry_after(exc, result.attempts - 1)
+                        if backoff is None or result.attempts > retries:
+                            break
+                        resume_at = max(resume_at, monotonic() + backoff)
+                    else:
+                        result.error = None
+                        break
+                else:
+                    return
+
+        await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, len(users))))))
+        return report(results)
 
 
 class EmbedingContext(_Context):
@@ -205,11 +701,132 @@ class EmbedingContext(_Context):
         This is a shorthand to creating an :class:`discord.Embed` and sending it.
         All arguments are passed to :class:`discord.Embed`.
 
+        When the first argument is an :class:`disctools.embeds.EmbedTemplate`,
+        the keyword arguments fill in its replacement fields instead.
 
         Returns
         -------
         :class:`discord.Message`
             The message that was sent.
         """
+        if args and isinstance(args[0], EmbedTemplate):
+            return await self.send(embed=args[0].render(**kwargs))
         return await self.send(embed=discord.Embed(*args, **kwargs))
 
+    async def paginate(self, source, **kwargs) -> EmbedPaginator:
+        """|coro|
+        Send entries as pages of embeds the author can navigate with reactions.
+
+        The entries are read from ``source`` only as the pages are needed, the first page is sent
+        as soon as it is full. The navigation runs in the background, so this returns once the
+        first page is sent, await :meth:`disctools.embeds.EmbedPaginator.wait` to wait for it.
+
+        Parameters
+        ----------
+        source : Union[AsyncIterable[Entry], Iterable[Entry]]
+            The entries, strings for lines of the description or ``(name, value)`` tuples for fields.
+        **kwargs
+            Passed to :class:`disctools.embeds.EmbedPaginator`.
+
+        Returns
+        -------
+        :class:`disctools.embeds.EmbedPaginator`
+            The paginator, its message is None if there were no entries.
+        """
+        paginator = EmbedPaginator(source, **kwargs)
+        await paginator.start(self)
+        return paginator
+
+
+
+class CoalescingContext(EmbedingContext):
+    """An :class:`EmbedingContext` which collapses the messages sent during an invocation.
+
+    :meth:`send` and :meth:`send_embed` calls with just content and an embed are buffered,
+    the contents are joined by newlines into as few messages as possible, a message ends with
+    at most one embed to keep the order they were sent in. A message is sent once it is full,
+    the rest when the invocation ends, i.e. by :meth:`disctools.Bot.invoke`, or on :meth:`flush`.
+    :meth:`disctools.Bot.invoke` turns :attr:`coalesce` off then, so that the sends of listeners
+    like ``on_command_error``, which run afterwards, are not left in the buffer.
+    Any other call flushes the buffer first, so the order is kept.
+
+    A buffered call returns None, use :meth:`send_now` when the :class:`discord.Message` is needed.
+
+    Attributes
+    ----------
+    coalesce : :class:`bool`
+        Whether the sends are buffered, defaults to ``True``. Can be set per context,
+        e.g. in a ``pre_invoke``, or in the class body.
+    max_length : :class:`int`
+        The maximum length of the content of a combined message, 2000 by default.
+    """
+    coalesce: bool = True
+    max_length: ClassVar[int] = 2000
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._parts: List[str] = []
+        self._length = 0
+        self._embed: Optional[discord.Embed] = None
+
+    async def send(self, content: Any = None, **kwargs) -> Optional[discord.Message]:
+        """|coro|
+        Buffer the message, see :class:`CoalescingContext`.
+
+        The arguments are the same as :meth:`discord.ext.commands.Context.send`.
+
+        Returns
+        -------
+        Optional[:class:`discord.Message`]
+            The message sent, None if the call was buffered.
+        """
+        text = None if content is None else str(content)
+        if not self.coalesce or kwargs.keys() - {"embed"} or (text and len(text) > self.max_length):
+            return await self.send_now(content, **kwargs)
+
+        embed = kwargs.get("embed")
+        if self._embed is not None or (text and self._length + len(text) + bool(self._parts) > self.max_length):
+            # the buffered message is full
+            await self.flush()
+
+        if text:
+            self._length += len(text) + bool(self._parts)
+            self._parts.append(text)
+        if embed is not None:
+            self._embed = embed
+        return None
+
+    async def send_now(self, content: Any = None, **kwargs) -> discord.Message:
+        """|coro|
+        Flush the buffer and send the message right away.
+
+        Returns
+        -------
+        :class:`discord.Message`
+            The message that was sent.
+        """
+        await self.flush()
+        return await super().send(content, **kwargs)
+
+    async def reply(self, content: Any = None, **kwargs) -> discord.Message:
+        await self.flush()
+        return await super().reply(content, **kwargs)
+
+    async def flush(self) -> Optional[discord.Message]:
+        """|coro|
+        Send the buffered message, if any.
+
+        Returns
+        -------
+        Optional[:class:`discord.Message`]
+            The message sent, None if the buffer was empty.
+        """
+        if not (self._parts or self._embed):
+            return None
+
+        content = "\n".join(self._parts) or None
+        embed = self._embed
+        self._parts = []
+        self._length = 0
+        self._embed = None
+        return await super().send(content, embed=embed)
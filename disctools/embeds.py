@@ -0,0 +1,388 @@
+# MIT License
+
+# Copyright (c) 2020-present WizzyGeek
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Precompiled embed templates and a streaming paginator"""
+import asyncio
+import logging
+from collections import OrderedDict
+from copy import copy
+from time import monotonic
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
+
+import discord
+from discord.ext.commands import Context as _Context
+
+__all__ = (
+    "EmbedTemplate",
+    "RenderedEmbed",
+    "EmbedPaginator"
+)
+
+log = logging.getLogger(__name__)
+
+Path = Tuple[Union[str, int], ...]
+
+def _templates(data: Union[Dict[str, Any], List[Any]], path: Path = ()) -> List[Tuple[Path, str]]:
+    # the paths of the strings with replacement fields, or escaped braces
+    found = []
+    items: Iterable[Tuple[Union[str, int], Any]] = data.items() if isinstance(data, dict) else enumerate(data)
+    for key, value in items:
+        if isinstance(value, str):
+            if "{" in value or "}" in value:
+                found.append((path + (key,), value))
+        elif isinstance(value, (dict, list)):
+            found.extend(_templates(value, path + (key,)))
+    return found
+
+class RenderedEmbed:
+    """An embed rendered from an :class:`EmbedTemplate`, ready to be sent.
+
+    It can be passed as the ``embed`` of :meth:`discord.abc.Messageable.send` and
+    :meth:`discord.Message.edit`, which only use :meth:`to_dict`.
+    Use :meth:`to_embed` for a :class:`discord.Embed`.
+    """
+    __slots__ = ("_data",)
+
+    def __init__(self, data: Dict[str, Any]) -> None:
+        self._data = data
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} title={self._data.get('title')!r}>"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the serialized embed, the static parts are shared with the template
+        and must not be modified."""
+        return self._data
+
+    def to_embed(self) -> discord.Embed:
+        return discord.Embed.from_dict(self._data)
+
+class EmbedTemplate:
+    """An embed layout which is serialized once, and sent with only its variable parts filled in.
+
+    The strings of the embed may contain :meth:`str.format` replacement fields, like ``{user}``,
+    these are filled in by :meth:`render`. Only the dicts and lists on the way to the strings
+    with replacement fields are copied, the rest of the serialized embed is shared.
+
+    Example
+    -------
+    .. code-block:: python
+
+        stats = EmbedTemplate(title="Stats of {name}", colour=0x2F3136)
+        stats.embed.add_field(name="Messages", value="{messages}")
+        stats.compile()
+
+        await ctx.send_embed(stats, name=ctx.author.name, messages=count)
+
+    Parameters
+    ----------
+    embed : Optional[:class:`discord.Embed`]
+        The layout, built from the keyword arguments if None.
+    kwargs
+        Passed to :class:`discord.Embed` when no embed is given.
+
+    Attributes
+    ----------
+    embed : :class:`discord.Embed`
+        The layout, call :meth:`compile` after changing it.
+    """
+    __slots__ = ("embed", "_static", "_templates")
+
+    def __init__(self, embed: Optional[discord.Embed] = None, **kwargs) -> None:
+        self.embed = discord.Embed(**kwargs) if embed is None else embed
+        self.compile()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} title={self.embed.title!r} fields={len(self._templates)}>"
+
+    def compile(self) -> None:
+        """Serialize the layout, this is done on creation."""
+        self._static = self.embed.to_dict()
+        self._templates = _templates(self._static)
+
+    @property
+    def fields(self) -> List[str]:
+        """List[:class:`str`]: The strings with replacement fields."""
+        return [template for _, template in self._templates]
+
+    def render(self, **values: Any) -> RenderedEmbed:
+        """Fill in the replacement fields.
+
+        Raises
+        ------
+        :exc:`KeyError`
+            A replacement field was not given a value.
+        """
+        data = copy(self._static)
+        copied: Dict[Path, Any] = {(): data}
+        for path, template in self._templates:
+            container = data
+            for depth in range(1, len(path)):
+                parent, container = container, copied.get(path[:depth])
+                if container is None:
+                    container = copied[path[:depth]] = copy(parent[path[depth - 1]])
+                    parent[path[depth - 1]] = container
+            container[path[-1]] = template.format_map(values)
+        return RenderedEmbed(data)
+
+# Discord's limits on embeds
+_TITLE = 256
+_DESCRIPTION = 2048
+_FIELDS = 25
+_FIELD_NAME = 256
+_FIELD_VALUE = 1024
+_TOTAL = 6000
+_FOOTER = 32 # room kept for the page number
+
+Entry = Union[str, Tuple[str, str]]
+
+def _clip(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 1] + "\N{HORIZONTAL ELLIPSIS}"
+
+async def _aiter(entries: Iterable[Entry]) -> AsyncIterator[Entry]:
+    for entry in entries:
+        yield entry
+
+class EmbedPaginator:
+    """Pages through entries from an async iterator, reading them only as the pages are needed.
+
+    Strings become lines of the description and ``(name, value)`` tuples become fields, a page is
+    filled up to Discord's limits on embeds, or ``per_page`` entries. The first page is sent as soon
+    as it is full, the next page is read from the iterator when the author navigates to it with the
+    reactions, and the message is edited in place.
+
+    Only the last ``max_pages`` pages are kept, the author can not go back further than those.
+    The session ends when the author stops it, after ``timeout`` seconds without navigation,
+    or after ``lifetime`` seconds, whichever is first. The iterator is closed then.
+    Errors which end the session, e.g. a failed edit or a failing iterator, are logged.
+
+    Created by :meth:`disctools.context.EmbedingContext.paginate`.
+
+    Parameters
+    ----------
+    source : Union[AsyncIterable[Entry], Iterable[Entry]]
+        The entries, strings or ``(name, value)`` tuples.
+    title : Optional[:class:`str`]
+        The title of every page.
+    colour : Optional[Union[:class:`int`, :class:`discord.Colour`]]
+        The colour of every page.
+    per_page : Optional[:class:`int`]
+        The maximum number of entries per page, by default only Discord's limits apply.
+    timeout : :class:`float`
+        The seconds the session waits for navigation, by default 60.
+    lifetime : :class:`float`
+        The seconds the session lasts for at most, by default 600.
+    max_pages : :class:`int`
+        The number of pages kept in memory, by default 10.
+
+    Attributes
+    ----------
+    message : Optional[:class:`discord.Message`]
+        The message of the paginator, once sent.
+    page : :class:`int`
+        The index of the page shown.
+    exhausted : :class:`bool`
+        Whether all the entries have been read.
+    """
+    PREVIOUS = "\N{BLACK LEFT-POINTING TRIANGLE}"
+    NEXT = "\N{BLACK RIGHT-POINTING TRIANGLE}"
+    STOP = "\N{BLACK SQUARE FOR STOP}"
+
+    def __init__(self, source: Union[AsyncIterable[Entry], Iterable[Entry]], *,
+                 title: Optional[str] = None,
+                 colour: Union[int, discord.Colour, None] = None,
+                 per_page: Optional[int] = None,
+                 timeout: float = 60.0,
+                 lifetime: float = 600.0,
+                 max_pages: int = 10) -> None:
+        if max_pages < 1:
+            raise ValueError("max_pages must be at least 1")
+        self._source: AsyncIterator[Entry] = (source.__aiter__() if hasattr(source, "__aiter__")
+                                              else _aiter(source))
+        self.title = None if title is None else _clip(title, _TITLE)
+        self.colour = colour
+        self.per_page = per_page
+        self.timeout = timeout
+        self.lifetime = lifetime
+        self.max_pages = max_pages
+
+        self.message: Optional[discord.Message] = None
+        self.page = 0
+        self.exhausted = False
+        self._pages: OrderedDict[int, discord.Embed] = OrderedDict()
+        self._pending: Optional[Entry] = None
+        self._last = -1
+        self._task: Optional[asyncio.Task] = None
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} page={self.page} pages={len(self._pages)} exhausted={self.exhausted}>"
+
+    async def _next_entry(self) -> Optional[Entry]:
+        entry, self._pending = self._pending, None
+        if entry is None and not self.exhausted:
+            try:
+                entry = await self._source.__anext__()
+            except StopAsyncIteration:
+                self.exhausted = True
+        return entry
+
+    async def _read_page(self) -> Optional[discord.Embed]:
+        embed = discord.Embed(title=self.title or discord.Embed.Empty,
+                              colour=discord.Embed.Empty if self.colour is None else self.colour)
+        total = len(self.title or "") + _FOOTER
+        lines: List[str] = []
+        length = 0
+        count = 0
+
+        while self.per_page is None or count < self.per_page:
+            entry = await self._next_entry()
+            if entry is None:
+                break
+
+            if isinstance(entry, str):
+                line = _clip(entry, _DESCRIPTION)
+                size = len(line) + bool(lines)
+                if count and (length + size > _DESCRIPTION or total + size > _TOTAL):
+                    self._pending = entry
+                    break
+                lines.append(line)
+                length += size
+            else:
+                name, value = _clip(str(entry[0]), _FIELD_NAME), _clip(str(entry[1]), _FIELD_VALUE)
+                size = len(name) + len(value)
+                if count and (len(embed.fields) == _FIELDS or total + size > _TOTAL):
+                    self._pending = entry
+                    break
+                embed.add_field(name=name, value=value, inline=False)
+            total += size
+            count += 1
+
+        if not count:
+            return None
+        if lines:
+            embed.description = "\n".join(lines)
+        return embed
+
+    async def _get(self, index: int) -> Optional[discord.Embed]:
+        if index != self._last + 1:
+            return self._pages.get(index)
+
+        embed = await self._read_page()
+        if embed is not None:
+            self._last = index
+            self._pages[index] = embed
+            if len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+        return embed
+
+    def _render(self, index: int, embed: discord.Embed) -> discord.Embed:
+        total = f"/{self._last + 1}" if self.exhausted and self._pending is None else ""
+        return embed.set_footer(text=f"Page {index + 1}{total}")
+
+    async def start(self, ctx: _Context) -> Optional[discord.Message]:
+        """|coro|
+        Send the first page, the navigation then runs in the background.
+
+        Returns
+        -------
+        Optional[:class:`discord.Message`]
+            The message sent, None if there were no entries.
+        """
+        embed = await self._get(0)
+        if embed is None:
+            await self.close()
+            return None
+
+        send = getattr(ctx, "send_now", ctx.send)
+        message = self.message = await send(embed=self._render(0, embed))
+        if self.exhausted and self._pending is None:
+            # a single page
+            await self.close()
+        else:
+            self._task = asyncio.ensure_future(self._navigate(ctx, message))
+            self._task.add_done_callback(self._log_error)
+        return message
+
+    def _log_error(self, task: "asyncio.Task[None]") -> None:
+        # nothing else awaits the result of the task
+        if not task.cancelled() and task.exception() is not None:
+            log.error("Pagination of message %s failed", self.message and self.message.id,
+                      exc_info=task.exception())
+
+    async def wait(self) -> None:
+        """|coro|
+        Wait for the session to end."""
+        if self._task is not None:
+            await asyncio.wait((self._task,))
+
+    def stop(self) -> None:
+        """End the session."""
+        if self._task is not None:
+            self._task.cancel()
+
+    async def close(self) -> None:
+        """|coro|
+        Close the source and drop the pages, the session must be over."""
+        self._pages.clear()
+        aclose = getattr(self._source, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+    async def _navigate(self, ctx: _Context, message: discord.Message) -> None:
+        controls = (self.PREVIOUS, self.NEXT, self.STOP)
+        deadline = monotonic() + self.lifetime
+
+        def check(reaction: discord.Reaction, user: discord.abc.User) -> bool:
+            return (reaction.message.id == message.id and user.id == ctx.author.id
+                    and str(reaction.emoji) in controls)
+
+        try:
+            for emoji in controls:
+                await message.add_reaction(emoji)
+
+            while True:
+                remaining = min(self.timeout, deadline - monotonic())
+                if remaining <= 0:
+                    break
+                try:
+                    reaction, user = await ctx.bot.wait_for("reaction_add", check=check, timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+
+                emoji = str(reaction.emoji)
+                if emoji == self.STOP:
+                    break
+                index = self.page + (1 if emoji == self.NEXT else -1)
+                embed = await self._get(index) if index >= 0 else None
+                if embed is not None:
+                    self.page = index
+                    await message.edit(embed=self._render(index, embed))
+
+                try:
+                    await message.remove_reaction(reaction.emoji, user)
+                except discord.HTTPException:
+                    pass
+        finally:
+            try:
+                await message.clear_reactions()
+            except discord.HTTPException:
+                pass
+            await self.close()
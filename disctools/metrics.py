@@ -0,0 +1,211 @@
+# MIT License
+
+# Copyright (c) 2020-present WizzyGeek
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Phase level latency histograms for command invocations"""
+import os
+from bisect import bisect_left
+from inspect import isawaitable
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from discord.ext.commands import Command as _Command
+
+__all__ = (
+    "PHASES",
+    "Histogram",
+    "InvocationMetrics",
+    "MetricsSink",
+    "PrometheusSink"
+)
+
+#: The phases of an invocation which are timed, in the order they run.
+PHASES = ("checks", "parse", "before_hooks", "callback", "after_hooks", "dispatch_error")
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    """A histogram with fixed bucket bounds.
+
+    Attributes
+    ----------
+    buckets : Tuple[:class:`float`, ...]
+        The inclusive upper bounds of the buckets, in seconds.
+    counts : List[:class:`int`]
+        The number of observations per bucket, the last one is the ``+Inf`` bucket.
+    sum : :class:`float`
+        The sum of all the observations.
+    count : :class:`int`
+        The number of observations.
+    """
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} count={self.count} sum={self.sum}>"
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """Returns ``(upper bound, observations at or below it)`` pairs, ending with ``inf``."""
+        total = 0
+        ret = []
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            total += n
+            ret.append((bound, total))
+        return ret
+
+class InvocationMetrics:
+    """Aggregates the time spent in each phase of command invocations.
+
+    Can be set as ``metrics`` on a :class:`disctools.Command`, a :class:`disctools.CCmd`,
+    where it covers all the subcommands too, or on a :class:`discord.ext.commands.Cog`.
+    The histograms are keyed by the :attr:`~discord.ext.commands.Command.qualified_name`
+    of the command and the phase, see :data:`PHASES`.
+
+    Parameters
+    ----------
+    buckets : Sequence[:class:`float`]
+        The upper bounds of the histogram buckets in seconds.
+    sinks : Iterable[:class:`MetricsSink`]
+        The sinks the metrics are exported to by :meth:`export`.
+
+    Attributes
+    ----------
+    histograms : Dict[Tuple[:class:`str`, :class:`str`], :class:`Histogram`]
+        The histograms keyed by ``(qualified_name, phase)``.
+    owners : Dict[:class:`str`, :class:`str`]
+        The qualified name of the :class:`disctools.CCmd`, or else the name of the cog,
+        which owns the command, empty if none.
+    """
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS, sinks: Iterable["MetricsSink"] = ()) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.sinks: List[MetricsSink] = list(sinks)
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+        self.owners: Dict[str, str] = {}
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} commands={len(self.owners)} sinks={len(self.sinks)}>"
+
+    def observe(self, command: _Command, phase: str, seconds: float) -> None:
+        """Record that ``phase`` of an invocation of ``command`` took ``seconds``."""
+        name = command.qualified_name
+        try:
+            hist = self.histograms[name, phase]
+        except KeyError:
+            hist = self.histograms[name, phase] = Histogram(self.buckets)
+            if name not in self.owners:
+                self.owners[name] = _owner_of(command)
+        hist.observe(seconds)
+
+    def lap(self, command: _Command, phase: str, start: float) -> float:
+        """Record the time elapsed since ``start``, a :func:`time.perf_counter` reading,
+        and return the current reading."""
+        now = perf_counter()
+        self.observe(command, phase, now - start)
+        return now
+
+    def reset(self) -> None:
+        """Drop all the recorded observations."""
+        self.histograms.clear()
+        self.owners.clear()
+
+    async def export(self) -> None:
+        """|coro|
+        Export the metrics to all the sinks."""
+        for sink in self.sinks:
+            ret = sink.export(self)
+            if isawaitable(ret):
+                await ret
+
+def _owner_of(command: _Command) -> str:
+    cogcmd = getattr(command, "cogcmd", None)
+    if cogcmd is not None:
+        return cogcmd.qualified_name
+    if command.cog is not None:
+        return command.cog.qualified_name
+    return ""
+
+class MetricsSink:
+    """The base class for sinks which :class:`InvocationMetrics` are exported to."""
+    def export(self, metrics: InvocationMetrics) -> Any:
+        """Export the metrics, this may be a coroutine function."""
+        raise NotImplementedError
+
+class PrometheusSink(MetricsSink):
+    """Exports the metrics in the Prometheus text exposition format.
+
+    Parameters
+    ----------
+    path : Optional[:class:`str`]
+        The file to write to, e.g. for the textfile collector of the node exporter.
+        The file is replaced atomically.
+    write : Optional[Callable[[:class:`str`], Any]]
+        Called with the text instead of writing a file, e.g. to push it to an endpoint,
+        this may be a coroutine function.
+    name : :class:`str`
+        The name of the metric, by default ``disctools_command_phase_seconds``.
+    """
+    def __init__(self, path: Optional[str] = None, *,
+                 write: Optional[Callable[[str], Any]] = None,
+                 name: str = "disctools_command_phase_seconds") -> None:
+        if (path is None) == (write is None):
+            raise TypeError("exactly one of path and write must be given")
+        self.path = path
+        self.write = write
+        self.name = name
+
+    def render(self, metrics: InvocationMetrics) -> str:
+        """Returns the metrics in the text exposition format."""
+        name = self.name
+        lines = [f"# HELP {name} Time spent in each phase of command invocations.",
+                 f"# TYPE {name} histogram"]
+        for (command, phase), hist in sorted(metrics.histograms.items()):
+            labels = (f'command="{_escape(command)}",owner="{_escape(metrics.owners.get(command, ""))}",'
+                      f'phase="{phase}"')
+            for bound, n in hist.cumulative():
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{name}_bucket{{{labels},le="{le}"}} {n}')
+            lines.append(f"{name}_sum{{{labels}}} {hist.sum!r}")
+            lines.append(f"{name}_count{{{labels}}} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, metrics: InvocationMetrics) -> Any:
+        text = self.render(metrics)
+        if self.write is not None:
+            return self.write(text)
+
+        path = self.path
+        assert path is not None
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,231 @@
+# MIT License
+
+# Copyright (c) 2020-present WizzyGeek
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""On-demand profiling of live commands"""
+import asyncio
+import cProfile
+import os
+import sys
+import threading
+from collections import Counter
+from time import monotonic, sleep
+from types import CodeType, FrameType
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from .commands import Command
+
+__all__ = (
+    "ProfileSession",
+)
+
+_MODES = ("deterministic", "sampling")
+
+class ProfileSession:
+    """Profiles the invocations of a command, or of a :class:`disctools.CCmd` and all its subcommands.
+
+    Created by :meth:`disctools.Command.start_profiling`, the session ends after the given number of
+    invocations or seconds, whichever is first, or when :meth:`stop` is called.
+    The profile is then written to :attr:`path` and the session is detached from the command.
+
+    The ``deterministic`` mode uses :mod:`cProfile` and writes a :mod:`pstats` file, the hooks,
+    argument parsing and the callback show up as ``call_before_hooks``/``call_after_hooks``,
+    ``_parse_arguments`` and the callback itself. The ``sampling`` mode samples the stack of the
+    event loop every ``interval`` seconds and writes collapsed stacks, one ``frame;frame;... count``
+    line per stack, rooted at the phase, one of ``hooks``, ``parse``, ``main`` or ``other``.
+    The sampling mode has a much lower overhead and suits commands which are invoked a lot.
+
+    The profiler is active while any profiled invocation is, hence other tasks on the event loop
+    which run at the same time are captured too. The sampler thread sleeps in between.
+
+    A session must be created from the event loop of the bot, the loop it profiles.
+
+    Attributes
+    ----------
+    command : :class:`disctools.Command`
+        The profiled command.
+    path : :class:`str`
+        The file the profile is written to.
+    mode : :class:`str`
+        ``deterministic`` or ``sampling``.
+    invocations : :class:`int`
+        The number of invocations profiled so far.
+    """
+    def __init__(self, command: "Command", path: str, *,
+                 invocations: Optional[int] = None,
+                 seconds: Optional[float] = None,
+                 mode: str = "deterministic",
+                 interval: float = 0.001) -> None:
+        if mode not in _MODES:
+            raise ValueError(f"mode must be one of {', '.join(_MODES)}")
+        if invocations is None and seconds is None:
+            raise TypeError("either invocations or seconds must be given")
+
+        self.command = command
+        self.path = path
+        self.mode = mode
+        self.interval = interval
+        self.invocations = 0
+        self._limit = invocations
+        self._deadline = None if seconds is None else monotonic() + seconds
+        self._active = 0
+        self._stopped = False
+        # the loop which runs the invocations, the timer and waiters belong to it
+        loop = asyncio.get_running_loop()
+        self._done = loop.create_future()
+        # ends the session even if no invocation arrives after the deadline
+        self._timer = None if seconds is None else loop.call_later(seconds, self._on_deadline)
+
+        self._profiler: Optional[cProfile.Profile] = None
+        self._sampler: Optional[threading.Thread] = None
+        self._samples: Counter = Counter()
+        # set while an invocation is active or once the session is over
+        self._wake = threading.Event()
+        self._phases: Dict[CodeType, str] = {}
+        if mode == "deterministic":
+            self._profiler = cProfile.Profile()
+        else:
+            self._phases = _phase_codes(command)
+            self._thread_id = threading.get_ident()
+            self._sampler = threading.Thread(target=self._sample, name=f"profile-{command.qualified_name}",
+                                             daemon=True)
+            self._sampler.start()
+
+    def __repr__(self) -> str:
+        return (f"<{self.__class__.__name__} command={self.command.qualified_name!r} mode={self.mode} "
+                f"invocations={self.invocations} done={self.done}>")
+
+    @property
+    def done(self) -> bool:
+        """:class:`bool`: Whether the profile has been written."""
+        return self._done.done()
+
+    def _expired(self) -> bool:
+        return (self._stopped
+                or (self._limit is not None and self.invocations >= self._limit)
+                or (self._deadline is not None and monotonic() >= self._deadline))
+
+    def start(self) -> bool:
+        """Called when a profiled invocation starts, returns whether it is profiled."""
+        if self._expired():
+            if not self._active:
+                self._finish()
+            return False
+
+        self.invocations += 1
+        self._active += 1
+        if self._active == 1:
+            if self._profiler is not None:
+                self._profiler.enable()
+            self._wake.set()
+        return True
+
+    def end(self) -> None:
+        """Called when a profiled invocation ends."""
+        self._active -= 1
+        if not self._active:
+            self._wake.clear()
+            if self._profiler is not None:
+                self._profiler.disable()
+            if self._expired():
+                self._finish()
+
+    def stop(self) -> None:
+        """End the session, the profile is written once the running invocations end."""
+        self._stopped = True
+        if not self._active:
+            self._finish()
+
+    def _on_deadline(self) -> None:
+        self._timer = None
+        if not self._active:
+            self._finish()
+
+    async def wait(self) -> str:
+        """|coro|
+        Wait for the session to end, returns :attr:`path`."""
+        return await asyncio.shield(self._done)
+
+    def _finish(self) -> None:
+        if self.done:
+            return
+        self._stopped = True
+        self._wake.set()
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self.command._profile is self:
+            self.command._profile = None
+
+        if self._profiler is not None:
+            self._profiler.dump_stats(self.path)
+        else:
+            if self._sampler is not None:
+                self._sampler.join()
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                for stack, n in sorted(self._samples.items()):
+                    f.write(f"{stack} {n}\n")
+            os.replace(tmp, self.path)
+        self._done.set_result(self.path)
+
+    def _sample(self) -> None:
+        while not self._stopped:
+            if not self._active:
+                # idle until an invocation starts or the session ends
+                self._wake.wait()
+                continue
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is not None:
+                self._samples[self._collapse(frame)] += 1
+            del frame
+            sleep(self.interval)
+
+    def _collapse(self, frame: Optional[FrameType]) -> str:
+        stack: List[str] = []
+        phase = "other"
+        while frame is not None:
+            code = frame.f_code
+            phase = self._phases.get(code, phase)
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        stack.append(phase)
+        stack.reverse()
+        return ";".join(stack)
+
+def _phase_codes(command: "Command") -> Dict[CodeType, str]:
+    # the outermost phase frame on the stack decides the phase
+    from .commands import Command
+    codes = {
+        Command._parse_arguments.__code__: "parse",
+        Command.call_before_hooks.__code__: "hooks",
+        Command.call_after_hooks.__code__: "hooks",
+    }
+    commands = [command]
+    walk = getattr(command, "walk_commands", None)
+    if walk is not None:
+        commands.extend(walk())
+    for cmd in commands:
+        callback = getattr(cmd.callback, "__func__", cmd.callback)
+        code = getattr(callback, "__code__", None)
+        if code is not None:
+            codes[code] = "main"
+    return codes
@@ -0,0 +1,322 @@
+# MIT License
+
+# Copyright (c) 2020-present WizzyGeek
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Token bucket rate limits for commands, with pluggable storage"""
+import sqlite3
+import threading
+from time import monotonic, time
+from typing import Callable, Dict, Hashable, Optional, TypeVar, Union
+
+import discord
+from discord.ext.commands import BucketType, CommandOnCooldown
+from discord.ext.commands import Context as _Context
+
+__all__ = (
+    "RateLimit",
+    "RateLimited",
+    "RateLimitBackend",
+    "MemoryBackend",
+    "SQLiteBackend"
+)
+
+T = TypeVar("T")
+
+class RateLimited(CommandOnCooldown):
+    """The invocation was rejected by a :class:`RateLimit`.
+
+    This inherits from :exc:`discord.ext.commands.CommandOnCooldown`, hence existing cooldown
+    error handlers apply, :attr:`cooldown` is the :class:`RateLimit`.
+
+    Attributes
+    ----------
+    limit : :class:`RateLimit`
+        The limit which rejected the invocation.
+    """
+    def __init__(self, limit: "RateLimit", retry_after: float) -> None:
+        self.limit = limit
+        super().__init__(limit, retry_after)
+
+class RateLimitBackend:
+    """The base class for the storage of token buckets.
+
+    The buckets are keyed by strings, a bucket missing from the storage is full.
+    """
+    def take(self, key: str, rate: int, per: float) -> float:
+        """Take a token from the bucket, returns 0 if one was taken,
+        else the seconds until one will be available."""
+        raise NotImplementedError
+
+    def refund(self, key: str, rate: int, per: float) -> None:
+        """Put back a token taken by :meth:`take`."""
+        raise NotImplementedError
+
+def _refill(tokens: float, elapsed: float, rate: int, per: float) -> float:
+    return min(rate, tokens + elapsed * rate / per)
+
+class _Bucket:
+    __slots__ = ("tokens", "stamp", "per")
+
+    def __init__(self, tokens: float, stamp: float, per: float) -> None:
+        self.tokens = tokens
+        self.stamp = stamp
+        self.per = per
+
+class MemoryBackend(RateLimitBackend):
+    """Keeps the buckets in process memory, as slotted records.
+
+    Buckets are kept in order of last use, each :meth:`take` drops up to ``sweep``
+    of the least recently used buckets which have refilled, so there is no periodic sweep.
+
+    Parameters
+    ----------
+    sweep : :class:`int`
+        The buckets checked for expiry per :meth:`take`, by default 2.
+    """
+    def __init__(self, sweep: int = 2) -> None:
+        self.sweep = sweep
+        self._buckets: Dict[str, _Bucket] = {}
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _expire(self, now: float) -> None:
+        buckets = self._buckets
+        for _ in range(self.sweep):
+            key = next(iter(buckets), None)
+            if key is None:
+                return
+            bucket = buckets[key]
+            if now - bucket.stamp < bucket.per:
+                return
+            del buckets[key]
+
+    def take(self, key: str, rate: int, per: float) -> float:
+        now = monotonic()
+        self._expire(now)
+
+        bucket = self._buckets.pop(key, None)
+        if bucket is None:
+            bucket = _Bucket(rate, now, per)
+        else:
+            bucket.tokens = _refill(bucket.tokens, now - bucket.stamp, rate, per)
+            bucket.stamp = now
+        # reinserted to keep the order of last use
+        self._buckets[key] = bucket
+
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            return 0.0
+        return (1 - bucket.tokens) * per / rate
+
+    def refund(self, key: str, rate: int, per: float) -> None:
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket.tokens = min(rate, bucket.tokens + 1)
+
+class _Lease:
+    __slots__ = ("tokens", "expires")
+
+    def __init__(self, tokens: int, expires: float) -> None:
+        self.tokens = tokens
+        self.expires = expires
+
+class SQLiteBackend(RateLimitBackend):
+    """Keeps the buckets in an SQLite database, so that shards running in separate
+    processes on the same machine share them.
+
+    The database is accessed synchronously, each transaction blocks the event loop until it
+    commits, for at most ``timeout`` seconds while another process holds the write lock.
+    To keep most calls of :meth:`take` off the database, a process takes up to ``lease``
+    tokens of a bucket at once and hands them out from memory for ``lease_time`` seconds.
+    Leased tokens which were not used are put back on the next transaction of their bucket,
+    hence a limit shared by processes may be stricter than set, but never looser.
+    Buckets which have refilled are deleted every ``sweep_every`` transactions.
+
+    Parameters
+    ----------
+    path : :class:`str`
+        The database file, shared by the processes.
+    table : :class:`str`
+        The table the buckets are kept in, by default ``disctools_ratelimits``.
+    sweep_every : :class:`int`
+        The number of transactions between sweeps, by default 1000.
+    lease : :class:`int`
+        The most tokens of a bucket taken from the database at once, by default 4.
+        ``1`` disables the leases.
+    lease_time : :class:`float`
+        The seconds leased tokens may be handed out for, by default 1.
+    timeout : :class:`float`
+        The seconds to wait for the write lock, by default 0.1. When it is not acquired
+        in time the invocation is rejected, as if the bucket were empty.
+    """
+    def __init__(self, path: str, *,
+                 table: str = "disctools_ratelimits",
+                 sweep_every: int = 1000,
+                 lease: int = 4,
+                 lease_time: float = 1.0,
+                 timeout: float = 0.1) -> None:
+        if not table.isidentifier():
+            raise ValueError("table must be an identifier")
+        if lease < 1:
+            raise ValueError("lease must be at least 1")
+        self.path = path
+        self.table = table
+        self.sweep_every = sweep_every
+        self.lease = lease
+        self.lease_time = lease_time
+        self.timeout = timeout
+        self._calls = 0
+        self._leases: Dict[str, _Lease] = {}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=timeout)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # WAL stays consistent without a sync per commit, only the last commits may be lost on power loss
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(f"CREATE TABLE IF NOT EXISTS {table} "
+                         "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, stamp REAL NOT NULL, per REAL NOT NULL)")
+
+    def close(self) -> None:
+        self._db.close()
+
+    def _transaction(self, func: Callable[[sqlite3.Connection], T]) -> T:
+        db = self._db
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            ret = func(db)
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+        return ret
+
+    def take(self, key: str, rate: int, per: float) -> float:
+        with self._lock:
+            lease = self._leases.pop(key, None)
+            returned = 0
+            if lease is not None:
+                if lease.expires > monotonic():
+                    lease.tokens -= 1
+                    if lease.tokens:
+                        self._leases[key] = lease
+                    return 0.0
+                returned = lease.tokens
+
+            now = time()
+            table = self.table
+            want = min(self.lease, rate)
+
+            def update(db: sqlite3.Connection) -> float:
+                row = db.execute(f"SELECT tokens, stamp FROM {table} WHERE key = ?", (key,)).fetchone()
+                tokens = rate if row is None else _refill(row[0] + returned, max(0.0, now - row[1]), rate, per)
+                taken = min(want, int(tokens))
+                db.execute(f"INSERT OR REPLACE INTO {table} (key, tokens, stamp, per) VALUES (?, ?, ?, ?)",
+                           (key, tokens - taken, now, per))
+
+                self._calls += 1
+                if self._calls >= self.sweep_every:
+                    self._calls = 0
+                    db.execute(f"DELETE FROM {table} WHERE stamp + per <= ?", (now,))
+                    limit = monotonic()
+                    for expired in [k for k, v in self._leases.items() if v.expires <= limit]:
+                        del self._leases[expired]
+
+                if not taken:
+                    return (1 - tokens) * per / rate
+                if taken > 1:
+                    self._leases[key] = _Lease(taken - 1, monotonic() + self.lease_time)
+                return 0.0
+
+            try:
+                return self._transaction(update)
+            except sqlite3.OperationalError:
+                # the database stayed locked, reject rather than stall the event loop further
+                if returned:
+                    self._leases[key] = _Lease(returned, 0.0)
+                return self.timeout
+
+    def refund(self, key: str, rate: int, per: float) -> None:
+        with self._lock:
+            lease = self._leases.get(key)
+            if lease is not None:
+                # put back with the lease on its next transaction
+                lease.tokens += 1
+                return
+
+            def update(db: sqlite3.Connection) -> None:
+                db.execute(f"UPDATE {self.table} SET tokens = MIN(?, tokens + 1) WHERE key = ?", (rate, key))
+
+            try:
+                self._transaction(update)
+            except sqlite3.OperationalError:
+                # the token is lost, the limit is only stricter for it
+                pass
+
+class RateLimit:
+    """A token bucket rate limit, ``rate`` invocations per ``per`` seconds for each bucket.
+
+    Can be set as ``rate_limit`` on a :class:`disctools.Command`, or on a :class:`disctools.CCmd`,
+    where the limit covers all the subcommands, i.e. they take tokens from the same buckets.
+    An invocation needs a token from every limit which covers it, else :exc:`RateLimited`
+    is raised and no tokens are taken.
+
+    Parameters
+    ----------
+    rate : :class:`int`
+        The number of tokens in a full bucket.
+    per : :class:`float`
+        The seconds a bucket takes to refill.
+    type : Union[:class:`discord.ext.commands.BucketType`, Callable[[:class:`discord.Message`], Hashable]]
+        What the buckets are per, by default :attr:`discord.ext.commands.BucketType.user`.
+    name : Optional[:class:`str`]
+        Identifies the limit in the backend, required when the backend is shared by several
+        limits or processes.
+    backend : Optional[:class:`RateLimitBackend`]
+        Where the buckets are kept, by default a :class:`MemoryBackend` of this limit.
+    """
+    def __init__(self, rate: int, per: float,
+                 type: Union[BucketType, Callable[[discord.Message], Hashable]] = BucketType.user, *,
+                 name: Optional[str] = None,
+                 backend: Optional[RateLimitBackend] = None) -> None:
+        if rate < 1 or per <= 0:
+            raise ValueError("rate must be at least 1 and per must be positive")
+        if backend is not None and name is None:
+            raise TypeError("a name is required with a backend")
+
+        self.rate = int(rate)
+        self.per = float(per)
+        self.type = type
+        self.name = name or ""
+        self.backend = backend or MemoryBackend()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} name={self.name!r} rate={self.rate} per={self.per} type={self.type}>"
+
+    def get_key(self, ctx: _Context) -> str:
+        """Returns the key of the bucket of the invocation in the backend."""
+        return f"{self.name}:{self.type(ctx.message)}"
+
+    def take(self, ctx: _Context) -> float:
+        """Take a token, returns 0 if one was taken, else the seconds until one will be available."""
+        return self.backend.take(self.get_key(ctx), self.rate, self.per)
+
+    def refund(self, ctx: _Context) -> None:
+        """Put back a token taken by :meth:`take`."""
+        self.backend.refund(self.get_key(ctx), self.rate, self.per)
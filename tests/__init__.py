@@ -18,5 +18,11 @@ def load_tests(loader, *args):
     return loader.loadTestsFromNames(
             ["tests.test_bot",
             "tests.test_cmd",
-            "tests.test_context"]
+            "tests.test_context",
+            "tests.test_concurrency",
+            "tests.test_metrics",
+            "tests.test_profiling",
+            "tests.test_cache",
+            "tests.test_ratelimit",
+            "tests.test_embeds"]
         )
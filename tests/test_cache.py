@@ -0,0 +1,54 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+from disctools import CCmd, Command, ResultCache, inject
+
+from .utils import dummy as _dummy
+from .utils import FakeBot, invoke_ctx
+
+
+class CacheTest(unittest.TestCase):
+    def test_cached_subcommand(self):
+        calls = []
+        sent = []
+
+        class group(CCmd):
+            main = _dummy
+            result_cache = ResultCache(maxsize=2, scope="guild")
+
+            @inject(name="square")
+            class square(Command):
+                async def main(self, ctx, num: int):
+                    calls.append(num)
+                    await asyncio.sleep(0)
+                    return num * num
+
+                async def respond(self, ctx, result):
+                    sent.append(result)
+
+        cmd = group(name="group")
+        cache = cmd.result_cache
+
+        def invoke(num, guild=1):
+            return cmd.invoke(invoke_ctx(f"group square {num}", "group", bot=FakeBot(),
+                                         guild=SimpleNamespace(id=guild)))
+
+        async def run():
+            await asyncio.gather(invoke(2), invoke(2), invoke(2, guild=2))
+            await invoke(2)
+            await invoke(3) # evicts guild 2
+            await invoke(2, guild=2)
+
+        asyncio.run(run())
+        self.assertEqual(calls, [2, 2, 3, 2])
+        self.assertEqual(sent, [4, 4, 4, 4, 9, 4])
+        self.assertEqual((cache.hits, cache.misses), (2, 4))
+
+        ctx = SimpleNamespace(guild=SimpleNamespace(id=1))
+        self.assertEqual(cache.invalidate("group square", ctx), 1)
+        self.assertEqual(cache.invalidate(cmd.square), 1)
+        self.assertEqual(len(cache), 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,14 @@
+import asyncio
 import unittest
+from types import SimpleNamespace
+
+import discord
+from discord.ext.commands import Cog, Greedy, MemberNotFound, command
 
 from disctools import CCmd, Command, inject
 
 from .utils import dummy as _dummy
+from .utils import FakeBot, fake_ctx, invoke_ctx
 
 
 class CMDTest(unittest.TestCase):
@@ -31,5 +37,373 @@ class CMDTest(unittest.TestCase):
 
         self.assertIsInstance(testCCmd().dummy, Command)
 
+    def test_parse_arguments(self):
+        @inject()
+        class test(Command):
+            async def main(self, ctx, num: int, *words: str, rest: str = "none"):
+                pass
+
+        ctx = fake_ctx("3 a b")
+        asyncio.run(test._parse_arguments(ctx))
+        self.assertEqual(ctx.args, [ctx, 3, "a", "b"])
+        self.assertEqual(ctx.kwargs, {"rest": "none"})
+
+    def test_plan_rebuild(self):
+        class testCCmd(CCmd):
+            main = _dummy
+            @command(cls=Command)
+            async def sub(self, ctx, arg: int):
+                pass
+
+        inst = testCCmd()
+        plan = inst.sub._get_plan()
+        self.assertIs(plan, inst.sub._get_plan())
+        self.assertEqual(plan.earg, "cogcmd")
+
+        inst.sub.cogcmd = None
+        self.assertIsNot(plan, inst.sub._get_plan())
+        self.assertIsNone(inst.sub._get_plan().earg)
+
+    def test_hook_chain(self):
+        calls = []
+
+        class testCCmd(CCmd):
+            main = _dummy
+
+            async def subcommand_before_invoke(self, ctx):
+                calls.append("ccmd_before")
+
+            async def subcommand_after_invoke(self, ctx):
+                calls.append("ccmd_after")
+
+            @inject()
+            class sub(Command):
+                main = _dummy
+
+                async def pre_invoke(self, ctx):
+                    calls.append("before")
+
+            @inject()
+            class bare(Command):
+                main = _dummy
+
+        inst = testCCmd()
+        ctx = fake_ctx(bot=SimpleNamespace(_before_invoke=None, _after_invoke=None))
+
+        asyncio.run(inst.sub.call_before_hooks(ctx))
+        asyncio.run(inst.sub.call_after_hooks(ctx))
+        self.assertEqual(calls, ["ccmd_before", "before", "ccmd_after"])
+
+        inst.bare.cogcmd = None
+        self.assertEqual(inst.bare._get_hooks(), ((), ()))
+
+        @inst.sub.after_invoke
+        async def after(ctx):
+            calls.append("after")
+
+        calls.clear()
+        asyncio.run(inst.sub.call_after_hooks(ctx))
+        self.assertEqual(calls, ["after", "ccmd_after"])
+
+    def test_error_chain(self):
+        calls = []
+
+        class testCCmd(CCmd):
+            main = _dummy
+
+            async def on_subcommand_error(self, ctx, error):
+                calls.append("ccmd")
+
+            @command(cls=Command, name="sub")
+            async def sub(self, ctx):
+                pass
+
+            @sub.error
+            async def sub_error(self, ctx, error):
+                calls.append(self)
+
+        inst = testCCmd()
+        ctx = fake_ctx(bot=SimpleNamespace(dispatch=lambda *args: calls.append("bot")))
+
+        asyncio.run(inst.sub.dispatch_error(ctx, Exception()))
+        self.assertEqual(calls, [inst, "ccmd", "bot"])
+        self.assertIs(inst.sub._get_error_chain(), inst.sub._get_error_chain())
+
+    def test_clean_params(self):
+        class testCCmd(CCmd):
+            main = _dummy
+            @command(cls=Command, name="sub")
+            async def sub(self, ctx, arg: int, other: str):
+                pass
+
+        sub = testCCmd().sub
+        params = sub.clean_params
+        self.assertEqual(list(params), ["arg", "other"])
+        self.assertIs(params, sub.clean_params)
+        with self.assertRaises(TypeError):
+            params["arg"] = None # type: ignore[index]
+
+        sub.cogcmd = None
+        self.assertEqual(list(sub.clean_params), ["ctx", "arg", "other"])
+
+    def test_concurrent_conversion(self):
+        started = []
+
+        class Fetch:
+            @classmethod
+            async def convert(cls, ctx, argument):
+                started.append(argument)
+                await asyncio.sleep(0)
+                # every conversion has started before any of them finishes
+                return len(started), argument.upper()
+
+        @inject(concurrent_conversion=True)
+        class test(Command):
+            async def main(self, ctx, a: Fetch, *b: Fetch, c: Fetch = None):
+                pass
+
+        ctx = fake_ctx('a b "c d"')
+        asyncio.run(test._parse_arguments(ctx))
+        self.assertEqual(ctx.args, [ctx, (3, "A"), (3, "B"), (3, "C D")])
+        self.assertEqual(ctx.kwargs, {"c": None})
+
+    def test_batched_members(self):
+        ids = list(range(10**17, 10**17 + 150))
+        cached = {i: SimpleNamespace(id=i) for i in ids[:10]}
+        queries = []
+
+        async def query_members(limit, user_ids, cache):
+            queries.append(user_ids)
+            return [SimpleNamespace(id=i) for i in user_ids if i != ids[-1]]
+
+        guild = SimpleNamespace(
+            get_member=cached.get, query_members=query_members, shard_id=None,
+            _state=SimpleNamespace(member_cache_flags=SimpleNamespace(joined=True))
+        )
+        bot = SimpleNamespace(
+            get_user=lambda i: None,
+            _get_websocket=lambda shard_id: SimpleNamespace(is_ratelimited=lambda: False)
+        )
+
+        @inject()
+        class test(Command):
+            async def main(self, ctx, *members: discord.Member):
+                pass
+
+        content = " ".join(f"<@!{i}>" for i in ids[:-1])
+        ctx = fake_ctx(content, bot=bot, guild=guild, message=SimpleNamespace(mentions=[]))
+        asyncio.run(test._parse_arguments(ctx))
+        self.assertEqual([m.id for m in ctx.args[1:]], ids[:-1])
+        self.assertEqual([len(q) for q in queries], [100, 39])
+
+        ctx = fake_ctx(str(ids[-1]), bot=bot, guild=guild, message=SimpleNamespace(mentions=[]))
+        with self.assertRaises(MemberNotFound):
+            asyncio.run(test._parse_arguments(ctx))
+
+    def test_greedy_members(self):
+        ids = (10**17, 10**17 + 1)
+        members = {i: SimpleNamespace(id=i, guild=True) for i in ids}
+
+        guild = SimpleNamespace(get_member=members.get, get_member_named=lambda name: None, shard_id=None)
+        bot = SimpleNamespace(get_user=lambda i: None)
+
+        @inject()
+        class test(Command):
+            async def main(self, ctx, *members: Greedy[discord.Member], reason: str):
+                pass
+
+        ctx = fake_ctx(f"{ids[0]} {ids[1]} some reason", bot=bot, guild=guild, message=SimpleNamespace(mentions=[]))
+        asyncio.run(test._parse_arguments(ctx))
+        self.assertEqual(ctx.args[1:], list(members.values()))
+        self.assertEqual(ctx.kwargs, {"reason": "some reason"})
+
+    def test_batched_users(self):
+        users = {i: SimpleNamespace(id=i) for i in range(10**17, 10**17 + 3)}
+        members = {i: SimpleNamespace(id=i, guild=True) for i in users}
+        queries = []
+
+        async def query_members(limit, user_ids, cache):
+            queries.append(user_ids)
+            return []
+
+        guild = SimpleNamespace(get_member=members.get, query_members=query_members, shard_id=None)
+        bot = SimpleNamespace(
+            get_user=users.get,
+            _get_websocket=lambda shard_id: SimpleNamespace(is_ratelimited=lambda: False)
+        )
+
+        @inject()
+        class test(Command):
+            async def main(self, ctx, *users: discord.User):
+                pass
+
+        ctx = fake_ctx(" ".join(map(str, users)), bot=bot, guild=guild, message=SimpleNamespace(mentions=[]))
+        asyncio.run(test._parse_arguments(ctx))
+        # same as UserConverter, the cached users and not the members
+        self.assertEqual(ctx.args[1:], list(users.values()))
+        self.assertEqual(queries, [])
+
+    def test_ccmd_copy(self):
+        class testCCmd(CCmd):
+            main = _dummy
+
+            @inject()
+            class sub(Command):
+                async def main(self, ctx, arg: int):
+                    pass
+
+                async def pre_invoke(self, ctx):
+                    pass
+
+        inst = testCCmd()
+        inst.sub._profile = object()
+        copy = inst.copy()
+        sub = copy.get_command("sub")
+
+        self.assertIsNot(sub, inst.sub)
+        self.assertIs(sub.cogcmd, copy)
+        self.assertIs(sub.parent, copy)
+        self.assertIs(sub.params, inst.sub.params)
+        self.assertIs(sub.callback.__self__, sub)
+        self.assertIs(sub._before_invoke.__self__, sub)
+        self.assertIs(inst.sub.cogcmd, inst)
+        self.assertIsNot(copy.all_commands, inst.all_commands)
+        self.assertIsNone(sub._profile)
+
+    def test_ccmd_index(self):
+        class base(CCmd):
+            main = _dummy
+            @inject()
+            class first(Command):
+                main = _dummy
+            @inject()
+            class second(Command):
+                main = _dummy
+
+        class child(base):
+            second = None
+            @inject()
+            class third(Command):
+                main = _dummy
+
+        self.assertEqual(list(base.__fut_sub_cmds__), ["first", "second"])
+        self.assertEqual(list(child.__fut_sub_cmds__), ["first", "third"])
+
+        one, two = base(), base()
+        self.assertEqual(set(one.all_commands), {"first", "second"})
+        self.assertEqual(set(two.all_commands), {"first", "second"})
+        self.assertIs(one.get_command("first"), base.first)
+        self.assertIsNot(two.get_command("first"), base.first)
+        self.assertIs(two.get_command("first").cogcmd, two)
+
+    def test_ccmd_mixin(self):
+        class leaf(Command):
+            main = _dummy
+
+        class Mixin:
+            sub = inject(name="sub")(leaf)
+            lazy = inject(name="lazy", lazy=True)(leaf)
+
+        class group(Mixin, CCmd):
+            main = _dummy
+
+        self.assertEqual(set(group.__fut_sub_cmds__), {"sub", "lazy"})
+        self.assertEqual({c.name for c in group().commands}, {"sub", "lazy"})
+
+    def test_ccmd_index_after_init(self):
+        class leaf(Command):
+            main = _dummy
+
+        class Mixin:
+            mixed = inject(name="mixed")(leaf)
+
+        class base(Mixin, CCmd):
+            main = _dummy
+            sub = inject(name="sub")(leaf)
+
+        first = base()
+
+        class child(base):
+            pass
+
+        self.assertEqual(set(child.__fut_sub_cmds__), {"sub", "mixed"})
+
+        class other(Mixin, CCmd):
+            main = _dummy
+
+        self.assertEqual(set(other.__fut_sub_cmds__), {"mixed"})
+        second = child()
+        self.assertEqual({c.name for c in second.commands}, {"sub", "mixed"})
+        self.assertIsNot(second.get_command("sub"), first.get_command("sub"))
+        self.assertIs(second.get_command("sub").cogcmd, second)
+
+    def test_lazy_in_cog(self):
+        with self.assertRaises((TypeError, RuntimeError)) as caught:
+            class cog(Cog):
+                top = inject(name="top", lazy=True)(CCmd)
+
+        error = caught.exception
+        self.assertIsInstance(error if isinstance(error, TypeError) else error.__cause__, TypeError)
+
+    def test_router(self):
+        seen = []
+
+        class leaf(Command):
+            async def main(self, ctx, arg: str):
+                seen.append((ctx.command.qualified_name, ctx.invoked_with, list(ctx.invoked_parents), arg))
+
+        class mid(CCmd):
+            main = _dummy
+            end = inject(name="end", aliases=["e"])(leaf)
+
+        class top(CCmd):
+            main = _dummy
+            middle = inject(name="middle", case_insensitive=True)(mid)
+
+        plain = top(name="top")
+        routed = top(name="top", use_router=True)
+        self.assertTrue(routed.use_router)
+
+        for cmd in (plain, routed):
+            for content in ("top middle END x", "top middle e x", "top middle missing"):
+                ctx = invoke_ctx(content, "top", bot=FakeBot())
+                asyncio.run(cmd.invoke(ctx))
+                sub = ctx.invoked_subcommand
+                seen.append((sub and sub.qualified_name, ctx.subcommand_passed, list(ctx.invoked_parents)))
+
+        self.assertEqual(seen[:len(seen) // 2], seen[len(seen) // 2:])
+        self.assertEqual(seen[0][1:], ("END", ["top", "middle"], "x"))
+
+    def test_lazy_subcommands(self):
+        built = []
+
+        class testCCmd(CCmd):
+            main = _dummy
+
+            @inject(lazy=True, aliases=["l"])
+            class lazy(Command):
+                def __init__(self, *args, **kwargs):
+                    built.append(self)
+                    super().__init__(*args, **kwargs)
+
+                main = _dummy
+
+        inst = testCCmd()
+        self.assertIn("lazy", inst.all_commands)
+        self.assertEqual(built, [])
+
+        copy = inst.copy()
+        self.assertEqual(built, [])
+
+        sub = inst.get_command("l")
+        self.assertEqual(built, [sub])
+        self.assertIs(inst.get_command("lazy"), sub)
+        self.assertIs(sub.parent, inst)
+        self.assertIs(sub.cogcmd, inst)
+
+        self.assertEqual(len(copy.commands), 1)
+        self.assertEqual(len(built), 2)
+        self.assertIs(copy.get_command("lazy").cogcmd, copy)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,77 @@
+import asyncio
+import unittest
+
+from disctools import CCmd, Command, ConcurrencyLimit, QueueFull, QueueTimeout, inject
+
+from .utils import dummy as _dummy
+from .utils import FakeBot, invoke_ctx
+
+
+class LimitTest(unittest.TestCase):
+    def test_queue(self):
+        async def run():
+            limit = ConcurrencyLimit(1, queue=1, priority=lambda ctx: ctx)
+            await limit.acquire(0)
+
+            low = asyncio.ensure_future(limit.acquire(0))
+            await asyncio.sleep(0)
+            self.assertEqual(limit.waiting, 1)
+
+            with self.assertRaises(QueueFull):
+                await limit.acquire(0) # equal priority, arrived later
+
+            high = asyncio.ensure_future(limit.acquire(1))
+            await asyncio.sleep(0)
+            with self.assertRaises(QueueFull):
+                await low
+
+            limit.release()
+            await high
+            self.assertEqual((limit.running, limit.waiting, limit.shed, limit.waited), (1, 0, 2, 1))
+            limit.release()
+            self.assertEqual(limit.running, 0)
+
+        asyncio.run(run())
+
+    def test_timeout(self):
+        async def run():
+            limit = ConcurrencyLimit(1, timeout=0.01)
+            await limit.acquire(None)
+            with self.assertRaises(QueueTimeout):
+                await limit.acquire(None)
+            self.assertEqual((limit.waiting, limit.timed_out), (0, 1))
+
+        asyncio.run(run())
+
+    def test_command(self):
+        limit = ConcurrencyLimit(1, queue=0)
+
+        async def run():
+            started = asyncio.Event()
+            finish = asyncio.Event()
+
+            class group(CCmd):
+                main = _dummy
+                concurrency_limit = limit
+
+                @inject(name="slow")
+                class slow(Command):
+                    async def main(self, ctx):
+                        started.set()
+                        await finish.wait()
+
+            cmd = group(name="group")
+            first = asyncio.ensure_future(cmd.invoke(invoke_ctx("group slow", "group", bot=FakeBot())))
+            await started.wait()
+
+            with self.assertRaises(QueueFull):
+                await cmd.invoke(invoke_ctx("group slow", "group", bot=FakeBot()))
+
+            finish.set()
+            await first
+            self.assertEqual(limit.running, 0)
+
+        asyncio.run(run())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,19 @@
+import asyncio
 import unittest
+from types import SimpleNamespace
 from typing import List
+from unittest import mock
 
+import discord
+from discord.ext.commands import Context
+
+from disctools import Bot, CoalescingContext
+from disctools.context import RolePositionIndex
 from disctools import TargetContext as TestCtx
 
 class MockUser:
     def __init__(self, top_role: int):
+        self.id = top_role
         self.top_role = top_role
         self._received = None
 
@@ -69,5 +78,203 @@ class ContextTest(unittest.TestCase):
         self.assertIsInstance(self.Context1.targets[0], MockUser)
         self.assertEqual(self.Context1.targets[1], self.User7, "Target Order preservation failed")
 
+    def test_target_ids(self):
+        users = [self.User5, self.User7, self.User4]
+        for i, user in enumerate(users):
+            user.id = i
+        self.Context1.targets = users
+        self.assertEqual(self.Context1.target_ids, {0, 1, 2})
+        self.assertTrue(self.Context1.is_user_target(self.User7))
+        self.assertEqual(self.Context1.common_targets([2, self.User5]), [self.User5, self.User4])
+        self.assertEqual(self.Context1.other_targets([self.User7]), [self.User5, self.User4])
+
+        self.Context1.targets = self.User7
+        self.assertEqual(self.Context1.target_ids, {1})
+        self.assertFalse(self.Context1.is_user_target(self.User5))
+
+        # modified in place, as the default targets, the mentions, might be
+        self.Context1.targets.append(self.User5)
+        self.assertTrue(self.Context1.is_user_target(self.User5))
+        self.Context1.targets[:] = [self.User4]
+        self.assertEqual(self.Context1.target_ids, {2})
+
+    def test_run_on_targets(self):
+        stop = asyncio.Event()
+        flaky = {self.User7: [ConnectionError()]}
+
+        async def action(user):
+            await asyncio.sleep(0)
+            if flaky.get(user):
+                raise flaky[user].pop()
+            if user is self.User4:
+                stop.set()
+            return user.top_role
+
+        users = [self.User5, self.User7, self.User4, self.User6]
+        with mock.patch("disctools.context._retry_after", lambda exc, attempt: 0.0 if attempt < 1 else None):
+            report = asyncio.run(self.Context1.run_on_targets(action, users, concurrency=1, stop=stop))
+
+        self.assertEqual([r.result for r in report.results], [5, 7, 4, None])
+        self.assertEqual([r.attempts for r in report.results], [1, 2, 1, 0])
+        self.assertEqual((report.succeeded, report.skipped, report.failed), (users[:3], [self.User6], []))
+        self.assertFalse(report)
+
+    def test_coalescing(self):
+        sent = []
+
+        async def send(ctx, content=None, **kwargs):
+            sent.append((content, kwargs.get("embed"), kwargs.get("file")))
+            return len(sent)
+
+        ctx = CoalescingContext(message=self.Message65, prefix="a")
+        embed = discord.Embed(title="x")
+
+        async def run():
+            self.assertIsNone(await ctx.send("a"))
+            await ctx.send_embed(title="x")
+            await ctx.send("b") # starts a new message, after the embed
+            await ctx.send("c" * 1999) # does not fit
+            self.assertEqual(await ctx.send("d", file="f"), 4)
+            await ctx.send(embed=embed)
+            await ctx.flush()
+            self.assertIsNone(await ctx.flush())
+
+        with mock.patch.object(Context, "send", send):
+            asyncio.run(run())
+
+        self.assertEqual([(c, e and e.title, f) for c, e, f in sent], [
+            ("a", "x", None), ("b", None, None), ("c" * 1999, None, None), ("d", None, "f"), (None, "x", None)
+        ])
+
+    def test_whisper(self):
+        def error(status):
+            response = SimpleNamespace(status=status, reason="", headers={"Retry-After": "0.01"})
+            return discord.HTTPException(response, "")
+
+        class Recipient:
+            def __init__(self, *errors):
+                self.errors = list(errors)
+                self.received = []
+
+            async def send(self, *args, **kwargs):
+                await asyncio.sleep(0)
+                if self.errors:
+                    raise self.errors.pop(0)
+                self.received.append(args)
+
+        ok, limited, closed = Recipient(), Recipient(error(429)), Recipient(error(403))
+        exhausted = Recipient(*(error(429) for _ in range(3)))
+        self.Context1.targets = [ok, limited, closed, exhausted]
+
+        report = asyncio.run(self.Context1.whisper(None, "hi", concurrency=2, retries=2))
+        self.assertFalse(report)
+        self.assertEqual(report.delivered, [ok, limited])
+        self.assertEqual([(user, exc.status) for user, exc in report.failed], [(closed, 403), (exhausted, 429)])
+        self.assertEqual(limited.received, [("hi",)])
+
+    def make_guild(self):
+        """A guild with roles 1 to 4 on a local connection state, returns it and a member factory"""
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        state = Bot("~", loop=loop)._connection
+        user = lambda i: {"id": i, "username": str(i), "discriminator": "0001", "avatar": None}
+        role = lambda i, pos: {"id": i, "name": str(i), "position": pos, "permissions": "0"}
+        state.user = discord.ClientUser(state=state, data=user(9))
+        guild = discord.Guild(data={"id": 1, "name": "g", "owner_id": 10, "members": [],
+                                    "roles": [role(1, 0), role(2, 1), role(3, 2), role(4, 2)]}, state=state)
+
+        def member(i, *roles, cache=True):
+            data = {"user": user(i), "roles": list(roles), "joined_at": None, "deaf": False, "mute": False}
+            member = discord.Member(data=data, guild=guild, state=state)
+            if cache:
+                guild._add_member(member)
+            return member
+
+        return guild, member
+
+    def test_partition(self):
+        guild, member = self.make_guild()
+        state = guild._state
+        role = lambda i, pos: {"id": i, "name": str(i), "position": pos, "permissions": "0"}
+        me, author, owner = member(9, 3), member(5, 2), member(10)
+        targets = [member(20), member(21, 2), member(22, 4), owner, member(23, 3)]
+        ctx = TestCtx(message=SimpleNamespace(author=author, mentions=targets, guild=guild, _state=state), prefix="a")
+
+        self.assertEqual(ctx.partition_targets(), (targets[:2], targets[2:]))
+        self.assertEqual(ctx.partition_above(me), (targets[:3] + targets[4:], [owner]))
+        for member in targets[:3] + targets[4:]:
+            self.assertFalse(member.top_role > me.top_role)
+
+        guild._add_role(discord.Role(guild=guild, state=state, data=role(5, 3)))
+        self.assertIn(5, RolePositionIndex.of(guild).ranks)
+
+    def test_resolve_targets(self):
+        guild, member = self.make_guild()
+        cached = [member(100000000000000000 + i) for i in range(3)]
+        uncached = {m.id: m for m in (member(200000000000000000 + i, cache=False) for i in range(150))}
+        queries = []
+
+        async def query_members(guild, *, limit, user_ids, cache):
+            queries.append(len(user_ids))
+            return [uncached[i] for i in user_ids if i in uncached]
+
+        async def read():
+            return "\n".join(str(i) for i in uncached).encode()
+
+        ids = [m.id for m in cached]
+        content = (f"!ban <@{ids[2]}> {ids[0]} 300000000000000000 <@!{ids[0]}> <@&{ids[1]}> <#{ids[1]}>"
+                   f" https://discord.com/channels/{ids[1]}/{ids[1]}/{ids[1]} id:{ids[1]}")
+
+        async def unread():
+            self.fail("only small text attachments are read")
+
+        attachments = [
+            SimpleNamespace(read=read, filename="ids", content_type="text/plain; charset=utf-8", size=1 << 10),
+            SimpleNamespace(read=unread, filename="ids.png", content_type="image/png", size=1 << 10),
+            SimpleNamespace(read=unread, filename="ids.txt", content_type=None, size=1 << 30),
+        ]
+        message = SimpleNamespace(author=self.User6, mentions=[], guild=guild, _state=guild._state,
+                                  content=content, attachments=attachments)
+        bot = SimpleNamespace(_get_websocket=lambda shard_id: SimpleNamespace(is_ratelimited=lambda: False))
+        ctx = TestCtx(message=message, bot=bot, prefix="!")
+        seen = []
+
+        with mock.patch.object(discord.Guild, "query_members", query_members):
+            state = asyncio.run(ctx.resolve_targets(progress=lambda state: seen.append(state.resolved)))
+
+        self.assertTrue(state.done)
+        self.assertEqual((state.total, state.resolved, state.missing), (153, 152, [300000000000000000]))
+        self.assertEqual(queries, [100, 51])
+        self.assertEqual(seen, [2, 101, 152, 152])
+        self.assertEqual(ctx.targets[:3], [cached[2], cached[0], uncached[200000000000000000]])
+        self.assertTrue(ctx.is_user_target(cached[0]))
+
+    def test_coalescing_listeners(self):
+        sent = []
+
+        async def send(ctx, content=None, **kwargs):
+            sent.append(content)
+
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        bot = Bot("!", loop=loop)
+        handled = asyncio.Event()
+
+        @bot.listen()
+        async def on_command_error(ctx, error):
+            await ctx.send(f"error: {error}")
+            handled.set()
+
+        async def run():
+            ctx = CoalescingContext(message=self.Message65, bot=bot, prefix="!", invoked_with="nosuch")
+            await ctx.send("before")
+            await bot.invoke(ctx)
+            await asyncio.wait_for(handled.wait(), 1)
+            self.assertEqual(ctx._parts, [])
+
+        with mock.patch.object(Context, "send", send):
+            loop.run_until_complete(run())
+        self.assertEqual(sent, ["before", 'error: Command "nosuch" is not found'])
+
 if __name__ == "__main__":
     unittest.main()
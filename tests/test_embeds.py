@@ -0,0 +1,158 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import discord
+from discord.ext.commands import Context
+
+from disctools import EmbedTemplate
+from disctools.embeds import EmbedPaginator
+from disctools.context import EmbedingContext
+
+class Message:
+    id = 1
+
+    def __init__(self, embed):
+        self.pages = [embed.to_dict()]
+        self.reactions = []
+
+    async def add_reaction(self, emoji):
+        self.reactions.append(emoji)
+
+    async def remove_reaction(self, emoji, user):
+        pass
+
+    async def clear_reactions(self):
+        self.reactions.clear()
+
+    async def edit(self, *, embed):
+        self.pages.append(embed.to_dict())
+
+async def send_page(ctx, *, embed):
+    return Message(embed)
+
+
+class EmbedTest(unittest.TestCase):
+    def test_render(self):
+        template = EmbedTemplate(title="Stats of {name}", description="{{static}}", colour=1)
+        template.embed.add_field(name="Messages", value="{messages}")
+        template.embed.add_field(name="Joined", value="never")
+        template.compile()
+
+        first = template.render(name="a", messages=1).to_dict()
+        second = template.render(name="b", messages=2).to_dict()
+
+        expected = discord.Embed(title="Stats of a", description="{static}", colour=1)
+        expected.add_field(name="Messages", value="1")
+        expected.add_field(name="Joined", value="never")
+        self.assertEqual(first, expected.to_dict())
+        self.assertEqual((second["title"], second["fields"][0]["value"]), ("Stats of b", "2"))
+        # only the path to the replaced strings is copied
+        self.assertIs(first["fields"][1], second["fields"][1])
+        self.assertEqual(template.render(name="c", messages=3).to_embed().title, "Stats of c")
+
+        with self.assertRaises(KeyError):
+            template.render(name="d")
+
+    def test_send_embed(self):
+        sent = []
+
+        async def send(ctx, content=None, *, embed=None):
+            sent.append(embed.to_dict())
+
+        ctx = EmbedingContext(message=SimpleNamespace(_state=None), prefix="a")
+        template = EmbedTemplate(title="{name}")
+        with mock.patch.object(Context, "send", send):
+            asyncio.run(ctx.send_embed(template, name="x"))
+            asyncio.run(ctx.send_embed(title="y"))
+        self.assertEqual([data["title"] for data in sent], ["x", "y"])
+
+    def test_paginate(self):
+        read = []
+
+        async def source():
+            for i in range(100):
+                read.append(i)
+                yield "x" * 100 if i % 2 else (f"field {i}", "y" * 100)
+
+        author = SimpleNamespace(id=5)
+        clicks = [EmbedPaginator.NEXT, EmbedPaginator.NEXT, EmbedPaginator.PREVIOUS,
+                  EmbedPaginator.PREVIOUS, EmbedPaginator.PREVIOUS, EmbedPaginator.STOP]
+
+        async def wait_for(event, *, check, timeout):
+            await asyncio.sleep(0)
+            reaction = SimpleNamespace(message=paginator.message, emoji=clicks.pop(0))
+            self.assertTrue(check(reaction, author))
+            self.assertFalse(check(reaction, SimpleNamespace(id=6)))
+            return reaction, author
+
+        ctx = EmbedingContext(message=SimpleNamespace(author=author, _state=None), prefix="!",
+                              bot=SimpleNamespace(wait_for=wait_for))
+
+        async def run():
+            nonlocal paginator
+            paginator = await ctx.paginate(source(), title="t", per_page=8, max_pages=2)
+            # the first page is sent as soon as it is full
+            self.assertEqual(len(read), 8)
+            await paginator.wait()
+
+        paginator = None
+        with mock.patch.object(Context, "send", send_page):
+            asyncio.run(run())
+
+        message = paginator.message
+        pages = message.pages
+        self.assertEqual(len(read), 24)
+        self.assertEqual([p["footer"]["text"] for p in pages], ["Page 1", "Page 2", "Page 3", "Page 2"])
+        self.assertEqual(len(pages[0]["fields"]), 4)
+        self.assertEqual(pages[0]["description"], "\n".join(["x" * 100] * 4))
+        self.assertEqual(pages[1]["fields"][0]["name"], "field 8")
+        self.assertEqual(message.reactions, [])
+        self.assertEqual(paginator.page, 1)
+
+    def test_paginate_limits(self):
+        ctx = EmbedingContext(message=SimpleNamespace(_state=None), prefix="!")
+        entries = ["z" * 3000] + ["y" * 1000] * 10 + [(str(i), "v") for i in range(30)]
+
+        async def run():
+            paginator = await ctx.paginate(entries)
+            self.assertIsNone((await ctx.paginate([])).message)
+            paginator.stop()
+            await paginator.wait()
+            return paginator
+
+        with mock.patch.object(Context, "send", send_page):
+            paginator = asyncio.run(run())
+
+        page = paginator.message.pages[0]
+        self.assertEqual(len(page["description"]), 2048)
+        self.assertTrue(page["description"].endswith("\N{HORIZONTAL ELLIPSIS}"))
+        self.assertNotIn("fields", page)
+        self.assertEqual(paginator.message.reactions, [])
+
+    def test_paginate_error(self):
+        async def source():
+            yield "first"
+            raise ValueError("gone")
+
+        async def wait_for(event, *, check, timeout):
+            return SimpleNamespace(message=paginator.message, emoji=EmbedPaginator.NEXT), author
+
+        author = SimpleNamespace(id=5)
+        ctx = EmbedingContext(message=SimpleNamespace(author=author, _state=None), prefix="!",
+                              bot=SimpleNamespace(wait_for=wait_for))
+
+        async def run():
+            nonlocal paginator
+            paginator = await ctx.paginate(source(), per_page=1)
+            await paginator.wait()
+
+        paginator = None
+        with mock.patch.object(Context, "send", send_page), self.assertLogs("disctools.embeds", "ERROR") as logs:
+            asyncio.run(run())
+        self.assertIn("gone", logs.output[0])
+        self.assertEqual(paginator.message.reactions, [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import asyncio
+import unittest
+
+from discord.ext.commands import CommandError
+
+from disctools import CCmd, Command, InvocationMetrics, PrometheusSink, inject
+from disctools.metrics import PHASES
+
+from .utils import dummy as _dummy
+from .utils import FakeBot, invoke_ctx
+
+
+class MetricsTest(unittest.TestCase):
+    def test_phases(self):
+        metrics = InvocationMetrics(buckets=(1.0, 0.5))
+
+        class group(CCmd):
+            main = _dummy
+
+            @inject(name="sub")
+            class sub(Command):
+                async def main(self, ctx, arg: int):
+                    pass
+
+        cmd = group(name="group", metrics=metrics)
+        bot = FakeBot()
+        ctx = invoke_ctx("group sub 1", "group", bot=bot)
+        asyncio.run(cmd.invoke(ctx))
+        asyncio.run(cmd.sub.dispatch_error(ctx, CommandError()))
+
+        self.assertEqual({phase for _, phase in metrics.histograms}, set(PHASES))
+        self.assertEqual(metrics.owners, {"group sub": "group"})
+        self.assertEqual(metrics.histograms["group sub", "callback"].counts, [1, 0, 0])
+
+        written = []
+        asyncio.run(InvocationMetrics(sinks=[PrometheusSink(write=written.append)]).export())
+        text = PrometheusSink(write=written.append).render(metrics)
+        self.assertEqual(len(written), 1)
+        self.assertIn('disctools_command_phase_seconds_bucket{command="group sub",owner="group",'
+                      'phase="parse",le="+Inf"} 1', text)
+        self.assertIn('disctools_command_phase_seconds_count{command="group sub",owner="group",'
+                      'phase="dispatch_error"} 1', text)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import asyncio
+import os
+import pstats
+import tempfile
+import unittest
+
+from disctools import CCmd, Command, inject
+
+from .utils import dummy as _dummy
+from .utils import FakeBot, invoke_ctx
+
+
+class ProfilingTest(unittest.TestCase):
+    def test_sessions(self):
+        class group(CCmd):
+            main = _dummy
+
+            @inject(name="sub")
+            class sub(Command):
+                async def main(self, ctx, arg: int):
+                    sum(range(100000))
+
+        cmd = group(name="group")
+
+        async def run(path, mode):
+            session = cmd.start_profiling(path, invocations=2, mode=mode)
+            for _ in range(3):
+                await cmd.invoke(invoke_ctx("group sub 1", "group", bot=FakeBot()))
+            self.assertEqual(await session.wait(), path)
+            self.assertEqual(session.invocations, 2)
+            self.assertIsNone(cmd._profile)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "sub.pstats")
+            asyncio.run(run(path, "deterministic"))
+            names = {func[2] for func in pstats.Stats(path).stats}
+            self.assertTrue({"main", "_parse_arguments", "call_before_hooks"} <= names)
+
+            path = os.path.join(tmp, "sub.collapsed")
+            asyncio.run(run(path, "sampling"))
+            with open(path) as f:
+                for line in f:
+                    stack, n = line.rsplit(" ", 1)
+                    self.assertIn(stack.split(";")[0], ("hooks", "parse", "main", "other"))
+                    self.assertGreater(int(n), 0)
+
+    def test_deadline(self):
+        cmd = inject(name="cmd")(type("cmd", (Command,), {"main": _dummy}))
+
+        async def run(path):
+            session = cmd.start_profiling(path, seconds=0.05, mode="sampling")
+            await asyncio.sleep(0.01)
+            # no invocation arrives, the sampler idles and the session still ends at the deadline
+            self.assertFalse(session._wake.is_set())
+            self.assertFalse(session._samples)
+            self.assertEqual(await asyncio.wait_for(session.wait(), 1), path)
+            self.assertFalse(session._sampler.is_alive())
+            self.assertIsNone(cmd._profile)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cmd.collapsed")
+            asyncio.run(run(path))
+            self.assertTrue(os.path.exists(path))
+
+            # only from the running loop of the bot
+            with self.assertRaises(RuntimeError):
+                cmd.start_profiling(path, invocations=1)
+            self.assertIsNone(cmd._profile)
+
+if __name__ == "__main__":
+    unittest.main()
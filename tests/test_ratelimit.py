@@ -0,0 +1,93 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+from disctools import CCmd, Command, RateLimit, RateLimited, inject
+from disctools.ratelimit import MemoryBackend, SQLiteBackend
+
+from .utils import dummy as _dummy
+from .utils import FakeBot, invoke_ctx
+
+
+def message(user):
+    return SimpleNamespace(author=SimpleNamespace(id=user))
+
+class RateLimitTest(unittest.TestCase):
+    def test_hierarchy(self):
+        class group(CCmd):
+            main = _dummy
+            rate_limit = RateLimit(3, 60)
+
+            @inject(name="a", rate_limit=RateLimit(1, 60))
+            class a(Command):
+                main = _dummy
+
+            @inject(name="b")
+            class b(Command):
+                main = _dummy
+
+        cmd = group(name="group")
+
+        def invoke(sub, user=1):
+            ctx = invoke_ctx(f"group {sub}", "group", bot=FakeBot(), message=message(user))
+            asyncio.run(cmd.invoke(ctx))
+
+        invoke("a")
+        with self.assertRaises(RateLimited) as cm:
+            invoke("a")
+        self.assertIs(cm.exception.limit, cmd.a.rate_limit)
+
+        invoke("b")
+        invoke("b") # the group token taken for the second "a" was refunded
+        with self.assertRaises(RateLimited) as cm:
+            invoke("b")
+        self.assertIs(cm.exception.cooldown, cmd.rate_limit)
+        self.assertGreater(cm.exception.retry_after, 0)
+        invoke("b", user=2)
+
+    def test_backends(self):
+        backend = MemoryBackend()
+        self.assertEqual(backend.take("k", 1, 0.001), 0)
+        asyncio.run(asyncio.sleep(0.002))
+        backend.take("other", 1, 60)
+        self.assertEqual(list(backend._buckets), ["other"]) # the refilled bucket expired
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "limits.db")
+            # two connections, as two shards would have
+            first, second = SQLiteBackend(path, lease=1), SQLiteBackend(path, lease=1)
+            limits = [RateLimit(2, 60, name="shared", backend=b) for b in (first, second)]
+            ctx = SimpleNamespace(message=message(1))
+            self.assertEqual([limits[0].take(ctx), limits[1].take(ctx)], [0, 0])
+            self.assertGreater(limits[0].take(ctx), 0)
+            limits[1].refund(ctx)
+            self.assertEqual(limits[0].take(ctx), 0)
+            first.close()
+            second.close()
+
+    def test_sqlite_lease(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "limits.db")
+            first, second = SQLiteBackend(path, lease=3, lease_time=0.05), SQLiteBackend(path)
+            transactions = []
+            first._db.set_trace_callback(lambda sql: sql == "COMMIT" and transactions.append(sql))
+
+            # 3 of the 4 tokens are leased at once, then handed out from memory
+            self.assertEqual([first.take("k", 4, 60) for _ in range(2)], [0, 0])
+            first.refund("k", 4, 60)
+            self.assertEqual(len(transactions), 1)
+            self.assertEqual(second.take("k", 4, 60), 0)
+            self.assertGreater(second.take("k", 4, 60), 0)
+
+            # the 2 unused tokens are put back once the lease expired, and leased again
+            asyncio.run(asyncio.sleep(0.06))
+            self.assertEqual([first.take("k", 4, 60), first.take("k", 4, 60)], [0, 0])
+            self.assertEqual(len(transactions), 2)
+            self.assertGreater(first.take("k", 4, 60), 0)
+            first.close()
+            second.close()
+
+if __name__ == "__main__":
+    unittest.main()
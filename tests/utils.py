@@ -1,3 +1,32 @@
 """Utils for tests"""
+from types import SimpleNamespace
+
+from discord.ext.commands.view import StringView
 
 async def dummy(*args, **kwargs): pass
+
+def fake_ctx(content: str = "", **kwargs) -> SimpleNamespace:
+    """A minimal stand-in for a Context, enough for argument parsing"""
+    kwargs.setdefault("bot", None)
+    return SimpleNamespace(view=StringView(content), **kwargs)
+
+class FakeBot:
+    """Just enough of a Bot to invoke commands"""
+    _before_invoke = None
+    _after_invoke = None
+
+    def __init__(self):
+        self.dispatched = []
+
+    async def can_run(self, ctx, *, call_once=False):
+        return True
+
+    def dispatch(self, event, *args):
+        self.dispatched.append((event, *args))
+
+def invoke_ctx(content: str, invoked_with: str, **kwargs):
+    """A stand-in Context for invoking a command, the view is past the invoker"""
+    ctx = fake_ctx(content, invoked_with=invoked_with, invoked_parents=[], invoked_subcommand=None,
+                   subcommand_passed=None, command=None, command_failed=False, **kwargs)
+    ctx.view.skip_string(invoked_with)
+    return ctx